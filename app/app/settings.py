@@ -59,25 +59,53 @@ MIDDLEWARE = [
 REST_FRAMEWORK = {
     "DATETIME_FORMAT": "%m-%d-%Y %H:%M:%S",
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.renderers.FastJSONRenderer",
+        "utils.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "utils.parsers.FastJSONParser",
+        "utils.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "utils.pagination.CountedPageNumberPagination",
     "PAGE_SIZE": 1000,
     "TEST_REQUEST_RENDERER_CLASSES": [
         "rest_framework.renderers.MultiPartRenderer",
         "rest_framework.renderers.JSONRenderer",
+        "utils.renderers.MessagePackRenderer",
         "rest_framework.renderers.TemplateHTMLRenderer",
     ],
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "auth.authentication.FirebaseAuthentication"
+        "auth.authentication.SessionTokenAuthentication",
+        "auth.authentication.FirebaseAuthentication",
         # 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
     # "EXCEPTION_HANDLER": "app.utils.handlers.custom_exception_handler"
 }
 
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
+    "user.backends.CachedModelBackend",
 ]
 
+# the default cache holds permission versions and sets, category ACLs, token
+# revocations and counts, which every worker must see alike. Deployments with
+# more than one worker set MEMCACHED_LOCATION (comma separated host:port), the
+# in-memory fallback is only consistent within a single process
+if os.getenv('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.getenv('MEMCACHED_LOCATION').split(','),
+        }
+    }
+
+# seconds a user's permission set is kept in the cache for a permission version
+PERMISSION_CACHE_TTL = int(os.getenv('PERMISSION_CACHE_TTL', 3600))
+
 ROOT_URLCONF = "app.urls"
 
 TEMPLATES = [
@@ -199,6 +227,44 @@ FIREBASE_CONFIG = {
 cred = firebase_admin.credentials.Certificate(cert=FIREBASE_CONFIG)
 firebase_admin.initialize_app(cred)
 
+# verified ID tokens are cached per worker until their exp claim.
+# FIREBASE_TOKEN_SHARED_CACHE may name an alias in CACHES shared by all workers
+FIREBASE_TOKEN_CACHE_SIZE = int(os.getenv('FIREBASE_TOKEN_CACHE_SIZE', 1024))
+FIREBASE_TOKEN_SHARED_CACHE = os.getenv('FIREBASE_TOKEN_SHARED_CACHE')
+
+# authenticated users are resolved by firebase_uid and cached per worker
+FIREBASE_USER_CACHE_SIZE = int(os.getenv('FIREBASE_USER_CACHE_SIZE', 1024))
+FIREBASE_USER_CACHE_TTL = int(os.getenv('FIREBASE_USER_CACHE_TTL', 60))
+
+# reject revoked ID tokens. tokens_valid_after is cached per uid and
+# refreshed in the background once older than FIREBASE_REVOCATION_TTL seconds
+FIREBASE_CHECK_REVOKED = bool(os.getenv('FIREBASE_CHECK_REVOKED'))
+FIREBASE_REVOCATION_TTL = int(os.getenv('FIREBASE_REVOCATION_TTL', 300))
+
+# key set ID tokens are verified against, preloaded by each worker at boot.
+# auth.keys.StaticKeySet serves the persisted key set without network access
+FIREBASE_KEYSET = os.getenv('FIREBASE_KEYSET', 'auth.keys.KeySet')
+FIREBASE_KEYSET_CACHE_PATH = os.getenv('FIREBASE_KEYSET_CACHE_PATH', '/tmp/firebase_keyset.json')
+
+# lifetime in seconds of session tokens issued by user:session
+SESSION_TOKEN_TTL = int(os.getenv('SESSION_TOKEN_TTL', 900))
+
+# upper bound for the ?size= page size of paginated endpoints
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 1000))
+
+# counts estimated above this many rows are reported as estimates, counts are cached for COUNT_CACHE_TTL seconds
+COUNT_EXACT_THRESHOLD = int(os.getenv('COUNT_EXACT_THRESHOLD', 10000))
+COUNT_CACHE_TTL = int(os.getenv('COUNT_CACHE_TTL', 30))
+
+# rows read from the database cursor and serialized at a time by export endpoints
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# upper bound for the number of objects created by one list payload
+BULK_CREATE_MAX_ITEMS = int(os.getenv('BULK_CREATE_MAX_ITEMS', 1000))
+
+# rows updated per statement and transaction by filter based bulk updates
+BULK_UPDATE_BATCH_SIZE = int(os.getenv('BULK_UPDATE_BATCH_SIZE', 1000))
+
 
 ALLOWED_HOSTS = ['*']
 CORS_ALLOW_ALL_ORIGINS = True
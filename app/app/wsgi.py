@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_wsgi_application()
+
+# fetch token signing keys before the first request reaches this worker
+from auth.keys import get_keyset  # noqa: E402
+
+get_keyset().start()
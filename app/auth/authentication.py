@@ -1,28 +1,63 @@
-from django.contrib.auth import get_user_model
+from django.conf import settings
 from rest_framework import authentication
 from rest_framework.exceptions import AuthenticationFailed
-from django.core.exceptions import ObjectDoesNotExist
 import firebase_admin.auth as auth
 
-User = get_user_model()
+from auth.cache import TokenCache
+from auth.keys import verify_id_token
+from auth.revocation import is_token_revoked
+from auth.session import read_session_token, session_user
+from auth.users import user_cache
+
+token_cache = TokenCache(
+    maxsize=getattr(settings, 'FIREBASE_TOKEN_CACHE_SIZE', 1024),
+    shared_alias=getattr(settings, 'FIREBASE_TOKEN_SHARED_CACHE', None),
+)
 
 
 class FirebaseAuthentication(authentication.BaseAuthentication):
     def authenticate(self, request):
 
         token = request.headers.get("Authorization")
+        if not token:
+            return None
 
-        try:
-            decoded_token = auth.verify_id_token(token)
-            email = decoded_token["email"]
-        except AuthenticationFailed:
+        decoded_token = token_cache.get(token)
+        if decoded_token is None:
+            try:
+                decoded_token = verify_id_token(token)
+            except AuthenticationFailed:
+                return None
+            except ValueError:
+                return None
+            except auth.InvalidIdTokenError:
+                return None
+            token_cache.set(token, decoded_token)
+
+        if is_token_revoked(decoded_token):
             return None
-        except ValueError:
+
+        user = user_cache.get_user(decoded_token["uid"], email=decoded_token.get("email"))
+        if user is None:
             return None
-        except auth.InvalidIdTokenError:
+        return (user, None)
+
+
+class SessionTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates locally signed session tokens issued by user:session.
+    Tokens are checked with a constant time HMAC compare and the user is
+    built from the token claims without a database lookup.
+    """
+    keyword = "Session"
+
+    def authenticate(self, request):
+        keyword, _, token = request.headers.get("Authorization", "").partition(" ")
+        if keyword != self.keyword or not token:
             return None
+
         try:
-            user = User.objects.get(email=email)
-            return (user, None)
-        except ObjectDoesNotExist:
-            return None
+            claims = read_session_token(token)
+        except (KeyError, ValueError) as err:
+            raise AuthenticationFailed(str(err))
+        return (session_user(claims), None)
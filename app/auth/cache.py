@@ -0,0 +1,82 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+
+class TokenCache:
+    """
+    Bounded, thread safe LRU cache of verified Firebase ID token claims.
+
+    Entries are keyed by a SHA-256 digest of the raw token so tokens are never
+    held in memory or written to a shared backend in the clear. Every entry
+    expires at the token's own ``exp`` claim. When ``shared_alias`` names a
+    cache in ``settings.CACHES`` verified claims are also published there so
+    other workers can reuse each other's verifications.
+    """
+
+    KEY_PREFIX = 'firebase_token:'
+
+    def __init__(self, maxsize=1024, shared_alias=None):
+        self.maxsize = maxsize
+        self.shared_alias = shared_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(token: str) -> str:
+        """Returns the hex digest used to key a token"""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @property
+    def shared(self):
+        if not self.shared_alias:
+            return None
+        return caches[self.shared_alias]
+
+    def get(self, token: str):
+        """Return cached claims for token or None if missing or expired"""
+        key = self.make_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, claims = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    return claims
+                del self._entries[key]
+
+        if self.shared is None:
+            return None
+        claims = self.shared.get(self.KEY_PREFIX + key)
+        if claims is None or claims.get('exp', 0) <= now:
+            return None
+        self._store(key, claims)
+        return claims
+
+    def set(self, token: str, claims: dict) -> None:
+        """Cache verified claims until the token's exp claim"""
+        timeout = claims.get('exp', 0) - time.time()
+        if timeout <= 0:
+            return
+        key = self.make_key(token)
+        self._store(key, claims)
+        if self.shared is not None:
+            self.shared.set(self.KEY_PREFIX + key, claims, timeout=int(timeout))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, claims):
+        with self._lock:
+            self._entries[key] = (claims['exp'], claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
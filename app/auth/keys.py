@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import requests
+import firebase_admin
+import firebase_admin.auth as auth
+from google.auth import jwt
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+ID_TOKEN_CERT_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+ID_TOKEN_ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class KeySet:
+    """
+    The x509 certificates Firebase ID tokens are signed with, as published by
+    Google and refreshed in a background thread before their Cache-Control
+    max-age runs out. The last good key set is persisted to disk so restarted
+    workers start warm.
+    """
+
+    def __init__(self, url: str = ID_TOKEN_CERT_URL, cache_path: str = None,
+                 refresh_margin: float = 0.2, min_interval: int = 60):
+        self.url = url
+        self.cache_path = cache_path or getattr(settings, 'FIREBASE_KEYSET_CACHE_PATH', None)
+        self.refresh_margin = refresh_margin
+        self.min_interval = min_interval
+        self._certs = {}
+        self._expires = 0.0
+        self._fetched = 0.0
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def start(self) -> None:
+        """Warm the key set, called once per worker at boot"""
+        if self._load():
+            self._schedule(self._expires - time.time())
+        else:
+            self._refresh_in_background()
+
+    def certs(self, kid: str = None) -> dict:
+        """Returns a mapping of key id to PEM encoded certificate"""
+        now = time.time()
+        stale = now >= self._expires
+        unknown_kid = kid is not None and kid not in self._certs
+        if not self._certs or ((stale or unknown_kid) and now - self._fetched >= self.min_interval):
+            try:
+                self.refresh()
+            except requests.RequestException:
+                # keep serving the previous keys, google overlaps rotations
+                if not self._certs:
+                    raise
+        return self._certs
+
+    def refresh(self) -> None:
+        """Fetch the current key set and schedule the next refresh"""
+        with self._lock:
+            self._fetched = time.time()
+            response = requests.get(self.url, timeout=10)
+            response.raise_for_status()
+            match = MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+            max_age = int(match.group(1)) if match else self.min_interval
+            self._certs = response.json()
+            self._expires = self._fetched + max_age
+        self._save()
+        self._schedule(max_age)
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except requests.RequestException:
+            self._schedule(self.min_interval / (1 - self.refresh_margin))
+
+    def _schedule(self, max_age):
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = max(max_age * (1 - self.refresh_margin), 0)
+        self._timer = threading.Timer(delay, self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _load(self) -> bool:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+            self._certs = data['certs']
+            self._expires = data['expires']
+        except (OSError, ValueError, KeyError):
+            return False
+        return bool(self._certs)
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path) or '.'
+        try:
+            fd, path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'certs': self._certs, 'expires': self._expires}, f)
+            os.replace(path, self.cache_path)
+        except OSError:
+            pass
+
+
+class StaticKeySet(KeySet):
+    """
+    Serves a fixed key set, by default the one persisted at
+    FIREBASE_KEYSET_CACHE_PATH. Certificates or public keys for locally signed
+    tokens can be supplied to test and benchmark authentication offline.
+    """
+
+    def __init__(self, certs: dict = None):
+        if certs is None:
+            with open(settings.FIREBASE_KEYSET_CACHE_PATH) as f:
+                certs = json.load(f)['certs']
+        self._certs = dict(certs)
+
+    def start(self) -> None:
+        pass
+
+    def certs(self, kid: str = None) -> dict:
+        return self._certs
+
+
+_keyset = None
+
+
+def get_keyset() -> KeySet:
+    """Returns the per worker key set configured by FIREBASE_KEYSET"""
+    global _keyset
+    if _keyset is None:
+        _keyset = import_string(getattr(settings, 'FIREBASE_KEYSET', 'auth.keys.KeySet'))()
+    return _keyset
+
+
+def verify_id_token(token, keyset: KeySet = None, project_id: str = None) -> dict:
+    """
+    Verifies a Firebase ID token against the worker's key set.
+    Performs the same checks as firebase_admin.auth.verify_id_token without
+    fetching certificates on the request path.
+    """
+    if not token or not isinstance(token, (str, bytes)):
+        raise ValueError('ID token must be a non-empty string')
+    keyset = keyset or get_keyset()
+    project_id = project_id or firebase_admin.get_app().project_id
+
+    try:
+        header = jwt.decode_header(token)
+        claims = jwt.decode(token, certs=keyset.certs(header.get('kid')), audience=project_id)
+    except ValueError as err:
+        raise auth.InvalidIdTokenError(str(err), cause=err)
+
+    if header.get('alg') != 'RS256':
+        raise auth.InvalidIdTokenError('ID token has incorrect algorithm')
+    if claims.get('iss') != ID_TOKEN_ISSUER_PREFIX + project_id:
+        raise auth.InvalidIdTokenError('ID token has incorrect issuer')
+    subject = claims.get('sub')
+    if not subject or not isinstance(subject, str) or len(subject) > 128:
+        raise auth.InvalidIdTokenError('ID token has an invalid subject')
+    claims['uid'] = subject
+    return claims
@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import firebase_admin.auth as auth
+from firebase_admin import exceptions
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from user.perms import bump_perm_version
+
+User = get_user_model()
+
+
+class RevocationChecker:
+    """
+    Compares a token's iat with a cached per uid tokens_valid_after read
+    from the Firebase admin API. Stale entries keep being served while they
+    are refreshed in the background, so only the first token seen for a uid
+    waits on Firebase. Entries are stored in the default cache, which
+    MEMCACHED_LOCATION shares between workers.
+    """
+
+    KEY = 'tokens_valid_after:{}'
+
+    def __init__(self, ttl: int = 300):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def tokens_valid_after(self, uid: str) -> float:
+        """Returns a unix timestamp, tokens issued before it are revoked"""
+        try:
+            user = auth.get_user(uid)
+        except auth.UserNotFoundError:
+            return float('inf')
+        if user.disabled:
+            return float('inf')
+        return (user.tokens_valid_after_timestamp or 0) / 1000
+
+    def is_revoked(self, uid: str, issued_at: float) -> bool:
+        entry = cache.get(self.KEY.format(uid))
+        if entry is None:
+            entry = self.refresh(uid)
+        elif entry['fetched'] + self.ttl < time.time():
+            self._refresh_in_background(uid)
+        return issued_at < entry['valid_after']
+
+    def refresh(self, uid: str) -> dict:
+        """Reads tokens_valid_after for uid from Firebase"""
+        entry = {'valid_after': self.tokens_valid_after(uid), 'fetched': time.time()}
+        cache.set(self.KEY.format(uid), entry, timeout=None)
+        return entry
+
+    def revoke(self, uid: str) -> None:
+        """Revokes uid's tokens and applies it without waiting for a refresh"""
+        auth.revoke_refresh_tokens(uid)
+        self.refresh(uid)
+        # session tokens carry the permission version, bumping it revokes them too
+        bump_perm_version(*User.objects.filter(firebase_uid=uid).values_list('pk', flat=True))
+
+    def _refresh_in_background(self, uid):
+        with self._lock:
+            if uid in self._pending:
+                return
+            self._pending.add(uid)
+        self._executor.submit(self._refresh_pending, uid)
+
+    def _refresh_pending(self, uid):
+        try:
+            self.refresh(uid)
+        except (exceptions.FirebaseError, ValueError):
+            # keep the stale entry, the next request schedules another attempt
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(uid)
+
+
+_checker = None
+
+
+def get_revocation_checker() -> RevocationChecker:
+    """Returns the per worker revocation checker"""
+    global _checker
+    if _checker is None:
+        _checker = RevocationChecker(ttl=getattr(settings, 'FIREBASE_REVOCATION_TTL', 300))
+    return _checker
+
+
+def is_token_revoked(decoded_token: dict) -> bool:
+    """
+    Returns True if FIREBASE_CHECK_REVOKED is set and decoded_token was
+    revoked, or its revocation can not be checked
+    """
+    if not getattr(settings, 'FIREBASE_CHECK_REVOKED', False):
+        return False
+    try:
+        return get_revocation_checker().is_revoked(decoded_token['uid'], decoded_token['iat'])
+    except exceptions.FirebaseError:
+        return True
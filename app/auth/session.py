@@ -0,0 +1,61 @@
+import base64
+import json
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from auth.users import build_user
+from user.perms import get_perm_version
+
+KEY_SALT = 'auth.session.SessionToken'
+USER_FIELDS = {'uid': 'id', 'email': 'email', 'staff': 'is_staff', 'super': 'is_superuser'}
+
+
+def _b64encode(value: bytes) -> str:
+    return base64.urlsafe_b64encode(value).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(salted_hmac(KEY_SALT, payload, algorithm='sha256').digest())
+
+
+def make_session_token(user, ttl: int = None):
+    """Returns a signed session token for user and its expiry timestamp"""
+    ttl = ttl or getattr(settings, 'SESSION_TOKEN_TTL', 900)
+    now = int(time.time())
+    claims = {claim: getattr(user, attr) for claim, attr in USER_FIELDS.items()}
+    claims.update({'pv': get_perm_version(user.id), 'iat': now, 'exp': now + ttl})
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    return f'{payload}.{_sign(payload)}', claims['exp']
+
+
+def read_session_token(token: str) -> dict:
+    """
+    Returns the claims of a session token.
+    Raises ValueError if the token is malformed, tampered with, expired
+    or was issued before the user's permissions last changed.
+    """
+    payload, _, signature = token.partition('.')
+    if not payload or not constant_time_compare(signature, _sign(payload)):
+        raise ValueError('Session token signature is invalid')
+    try:
+        claims = json.loads(_b64decode(payload))
+    except (TypeError, ValueError):
+        raise ValueError('Session token payload is invalid')
+    if claims['exp'] <= time.time():
+        raise ValueError('Session token has expired')
+    if claims['pv'] != get_perm_version(claims['uid']):
+        raise ValueError('Session token has been superseded')
+    return claims
+
+
+def session_user(claims: dict):
+    """Returns a User instance built from session claims without a query"""
+    values = {attr: claims[claim] for claim, attr in USER_FIELDS.items()}
+    values['is_active'] = True
+    return build_user(values)
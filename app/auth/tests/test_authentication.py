@@ -0,0 +1,137 @@
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIRequestFactory
+
+from auth.authentication import FirebaseAuthentication, token_cache
+from auth.cache import TokenCache
+from auth.users import UserCache, user_cache
+
+
+User = get_user_model()
+
+
+def sample_claims(email='test@workbound.info', lifetime=3600):
+    """Return decoded token claims expiring after lifetime seconds"""
+    now = int(time.time())
+    return {'email': email, 'uid': 'abc123', 'iat': now, 'exp': now + lifetime}
+
+
+class TokenCacheTests(SimpleTestCase):
+    """Test verified token cache"""
+
+    def test_cached_claims_returned(self):
+        """Test claims are returned for a cached token"""
+        cache = TokenCache(maxsize=2)
+        claims = sample_claims()
+        cache.set('token', claims)
+
+        self.assertEqual(cache.get('token'), claims)
+        self.assertIsNone(cache.get('other'))
+
+    def test_expired_claims_not_returned(self):
+        """Test claims past their exp are evicted"""
+        cache = TokenCache(maxsize=2)
+        claims = sample_claims(lifetime=1)
+        cache.set('token', claims)
+
+        with patch('auth.cache.time.time', return_value=claims['exp'] + 1):
+            self.assertIsNone(cache.get('token'))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_evicted(self):
+        """Test least recently used entry is evicted when full"""
+        cache = TokenCache(maxsize=2)
+        cache.set('one', sample_claims())
+        cache.set('two', sample_claims())
+        cache.get('one')
+        cache.set('three', sample_claims())
+
+        self.assertIsNotNone(cache.get('one'))
+        self.assertIsNone(cache.get('two'))
+        self.assertIsNotNone(cache.get('three'))
+
+    def test_shared_tier_reused(self):
+        """Test claims published to the shared cache are reused"""
+        claims = sample_claims()
+        TokenCache(shared_alias='default').set('token', claims)
+
+        self.assertEqual(TokenCache(shared_alias='default').get('token'), claims)
+
+
+class FirebaseAuthenticationTests(TestCase):
+    """Test Firebase authentication class"""
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(email='test@workbound.info', password='testpass123')
+        self.factory = APIRequestFactory()
+        token_cache.clear()
+
+    @patch('auth.authentication.verify_id_token')
+    def test_token_verified_once(self, verify):
+        """Test repeated requests with the same token verify once"""
+        verify.return_value = sample_claims()
+        request = self.factory.get('/', HTTP_AUTHORIZATION='token')
+
+        first = FirebaseAuthentication().authenticate(request)
+        second = FirebaseAuthentication().authenticate(request)
+
+        self.assertEqual(first[0], self.user)
+        self.assertEqual(second[0], self.user)
+        self.assertEqual(verify.call_count, 1)
+
+    def test_missing_token_not_authenticated(self):
+        """Test request without token is not authenticated"""
+        request = self.factory.get('/')
+
+        self.assertIsNone(FirebaseAuthentication().authenticate(request))
+
+
+class UserCacheTests(TestCase):
+    """Test cached user resolution by firebase uid"""
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(email='test@workbound.info', password='testpass123')
+        self.user.firebase_uid = 'abc123'
+        self.user.save()
+        self.cache = UserCache()
+
+    def test_user_cached_by_uid(self):
+        """Test a resolved user is served from cache without a query"""
+        with self.assertNumQueries(1):
+            self.cache.get_user('abc123')
+        with self.assertNumQueries(0):
+            user = self.cache.get_user('abc123')
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, self.user.email)
+
+    def test_unsynced_user_matched_by_email(self):
+        """Test a user without firebase uid is matched by email once"""
+        other = User.objects.create_user(email='other@workbound.info', password='testpass123')
+
+        user = self.cache.get_user('def456', email=other.email)
+        other.refresh_from_db()
+
+        self.assertEqual(user, other)
+        self.assertEqual(other.firebase_uid, 'def456')
+
+    def test_synced_user_not_matched_by_email(self):
+        """Test a user linked to another firebase uid is not matched by email"""
+        user = self.cache.get_user('def456', email=self.user.email)
+        self.user.refresh_from_db()
+
+        self.assertIsNone(user)
+        self.assertEqual(self.user.firebase_uid, 'abc123')
+
+    def test_cache_invalidated_on_save(self):
+        """Test saving a user drops its cached record"""
+        user_cache.clear()
+        user_cache.get_user('abc123')
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            user_cache.get_user('abc123')
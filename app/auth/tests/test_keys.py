@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import rsa
+import firebase_admin.auth as auth
+from google.auth import crypt, jwt
+from django.test import SimpleTestCase
+
+from auth.keys import KeySet, StaticKeySet, verify_id_token
+
+
+PROJECT_ID = 'workbound-test'
+
+
+def make_keys(kid='local'):
+    """Returns a signer and a key set holding its public key"""
+    public_key, private_key = rsa.newkeys(1024)
+    signer = crypt.RSASigner.from_string(private_key.save_pkcs1(), key_id=kid)
+    return signer, StaticKeySet({kid: public_key.save_pkcs1().decode('ascii')})
+
+
+def sign_token(signer, **claims):
+    """Returns a locally signed ID token"""
+    now = int(time.time())
+    payload = {
+        'iss': f'https://securetoken.google.com/{PROJECT_ID}',
+        'aud': PROJECT_ID,
+        'sub': 'abc123',
+        'email': 'test@workbound.info',
+        'iat': now,
+        'exp': now + 3600,
+    }
+    payload.update(claims)
+    return jwt.encode(signer, payload).decode('ascii')
+
+
+class VerifyIdTokenTests(SimpleTestCase):
+    """Test local ID token verification"""
+
+    def test_valid_token_verified(self):
+        """Test token signed by a key in the key set is verified"""
+        signer, keyset = make_keys()
+
+        claims = verify_id_token(sign_token(signer), keyset=keyset, project_id=PROJECT_ID)
+
+        self.assertEqual(claims['uid'], 'abc123')
+        self.assertEqual(claims['email'], 'test@workbound.info')
+
+    def test_unknown_key_rejected(self):
+        """Test token signed by a key outside the key set is rejected"""
+        signer, _ = make_keys()
+        _, keyset = make_keys()
+
+        with self.assertRaises(auth.InvalidIdTokenError):
+            verify_id_token(sign_token(signer), keyset=keyset, project_id=PROJECT_ID)
+
+    def test_wrong_issuer_rejected(self):
+        """Test token issued for another project is rejected"""
+        signer, keyset = make_keys()
+        token = sign_token(signer, iss='https://securetoken.google.com/other')
+
+        with self.assertRaises(auth.InvalidIdTokenError):
+            verify_id_token(token, keyset=keyset, project_id=PROJECT_ID)
+
+
+class KeySetTests(SimpleTestCase):
+    """Test background refreshed key set"""
+
+    def setUp(self) -> None:
+        fd, self.cache_path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self) -> None:
+        os.remove(self.cache_path)
+
+    @patch('auth.keys.requests.get')
+    def test_persisted_keys_loaded_without_fetch(self, get):
+        """Test keys persisted by a previous worker are used on start"""
+        with open(self.cache_path, 'w') as f:
+            json.dump({'certs': {'kid': 'cert'}, 'expires': time.time() + 3600}, f)
+        keyset = KeySet(cache_path=self.cache_path)
+
+        keyset.start()
+        keyset._timer.cancel()
+
+        self.assertEqual(keyset.certs('kid'), {'kid': 'cert'})
+        get.assert_not_called()
+
+    @patch('auth.keys.requests.get')
+    def test_refresh_persists_keys(self, get):
+        """Test fetched keys are persisted with their max-age"""
+        get.return_value.headers = {'Cache-Control': 'public, max-age=3600'}
+        get.return_value.json.return_value = {'kid': 'cert'}
+        keyset = KeySet(cache_path=self.cache_path)
+
+        keyset.refresh()
+        keyset._timer.cancel()
+
+        with open(self.cache_path) as f:
+            data = json.load(f)
+        self.assertEqual(data['certs'], {'kid': 'cert'})
+        self.assertAlmostEqual(data['expires'], time.time() + 3600, delta=5)
@@ -0,0 +1,59 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from auth.revocation import RevocationChecker
+
+
+class RevocationCheckerTests(TestCase):
+    """Test cached revocation checks"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.valid_after = {}
+        get_user = patch('auth.revocation.auth.get_user', side_effect=self._get_user)
+        revoke = patch('auth.revocation.auth.revoke_refresh_tokens', side_effect=self._revoke)
+        self.get_user = get_user.start()
+        revoke.start()
+        self.addCleanup(patch.stopall)
+        self.checker = RevocationChecker(ttl=300)
+
+    def _get_user(self, uid):
+        """Stand in for the Firebase admin API"""
+        return SimpleNamespace(disabled=False, tokens_valid_after_timestamp=self.valid_after.get(uid, 0) * 1000)
+
+    def _revoke(self, uid):
+        self.valid_after[uid] = int(time.time())
+
+    def test_valid_token_not_revoked(self):
+        """Test token issued after tokens_valid_after is accepted"""
+        self.assertFalse(self.checker.is_revoked('abc123', time.time()))
+
+    def test_source_read_once_per_uid(self):
+        """Test tokens_valid_after is read from the source once while fresh"""
+        for _ in range(3):
+            self.checker.is_revoked('abc123', time.time())
+
+        self.assertEqual(self.get_user.call_count, 1)
+
+    def test_revoked_token_rejected_immediately(self):
+        """Test revoking applies without waiting for the cache to expire"""
+        issued_at = time.time() - 10
+        self.assertFalse(self.checker.is_revoked('abc123', issued_at))
+
+        self.checker.revoke('abc123')
+
+        self.assertTrue(self.checker.is_revoked('abc123', issued_at))
+
+    def test_stale_entry_refreshed_in_background(self):
+        """Test stale entries are served while a refresh is scheduled"""
+        self.checker.is_revoked('abc123', time.time())
+
+        with patch.object(self.checker, '_refresh_in_background') as refresh:
+            with patch('auth.revocation.time.time', return_value=time.time() + 600):
+                self.checker.is_revoked('abc123', time.time())
+
+        refresh.assert_called_once_with('abc123')
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+
+User = get_user_model()
+
+USER_FIELDS = ('id', 'email', 'is_active', 'is_staff', 'is_superuser', 'firebase_uid')
+
+
+def build_user(values: dict):
+    """
+    Returns a User instance built from a dict of field values without a query.
+    Fields missing from values are deferred and load on first access.
+    """
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [values[f] for f in fields])
+
+
+class UserCache:
+    """
+    Per worker cache of lightweight user records keyed by firebase uid.
+    Records expire after ttl seconds and are dropped when the user is saved
+    or deleted in this worker.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_user(self, uid: str, email: str = None):
+        """Returns the user for a firebase uid or None if there is none"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(uid)
+                return build_user(entry[1])
+
+        values = User.objects.filter(firebase_uid=uid).values(*USER_FIELDS).first()
+        if values is None and email:
+            # users created before their first sync are matched once by email,
+            # a user already linked to another firebase uid is never taken over
+            unsynced = Q(firebase_uid__isnull=True) | Q(firebase_uid='')
+            values = User.objects.filter(unsynced, email=email).values(*USER_FIELDS).first()
+            if values is None:
+                return None
+            User.objects.filter(id=values['id']).update(firebase_uid=uid)
+            values['firebase_uid'] = uid
+        if values is None:
+            return None
+
+        with self._lock:
+            self._entries[uid] = (now + self.ttl, values)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return build_user(values)
+
+    def invalidate(self, user_id) -> None:
+        """Drops any record held for user_id"""
+        with self._lock:
+            for uid, (_, values) in list(self._entries.items()):
+                if values['id'] == user_id:
+                    del self._entries[uid]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'FIREBASE_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'FIREBASE_USER_CACHE_TTL', 60),
+)
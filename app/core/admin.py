@@ -2,12 +2,14 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import ugettext_lazy as _
 
+from auth.revocation import get_revocation_checker
 from core import models
 
 
 class UserAdmin(BaseUserAdmin):
     ordering = ['id']
     list_display = ['email', ]
+    actions = ['revoke_tokens']
     fieldsets = (
         (None, {'fields': ('email', 'password', 'firebase_uid')}),
         (
@@ -31,6 +33,12 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
+    @admin.action(description=_('Revoke Firebase tokens of selected users'))
+    def revoke_tokens(self, request, queryset):
+        checker = get_revocation_checker()
+        for uid in queryset.exclude(firebase_uid=None).values_list('firebase_uid', flat=True):
+            checker.revoke(uid)
+
 
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ['view_user_email', 'first_name', 'last_name']
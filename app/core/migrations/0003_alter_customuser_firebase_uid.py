@@ -0,0 +1,18 @@
+# Generated by Django 3.2.6 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_customuser_firebase_uid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='firebase_uid',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+    ]
@@ -21,7 +21,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(default=timezone.now)
-    firebase_uid = models.CharField(max_length=255, null=True, blank=True)
+    firebase_uid = models.CharField(max_length=255, null=True, blank=True, db_index=True)
 
     class Meta:
         verbose_name_plural = "Users"
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from portfolio.models import Portfolio, Section, WorkItem
+from portfolio.visibility import visible_sections, visible_workitems
+
+# rows per INSERT, keeping statements below the database's parameter limit
+BATCH_SIZE = 1000
+
+
+def clone_portfolio(portfolio, user, reference=None, schedule=False) -> Portfolio:
+    """
+    Copies portfolio with its sections and workitems into a new portfolio
+    created by user. Copies keep their category or task, meta and order,
+    get fresh prefixed ids and start unassigned and not completed. With
+    schedule, expected dates are set completion_days of each task from now.
+    The source is read with one query per model and written with one
+    bulk_create() per model, whatever its size. Only the sections and
+    workitems visible to user are copied.
+    """
+    sections = visible_sections(Section.objects.filter(portfolio=portfolio), user)
+    sections = list(sections.order_by('order', 'id').values_list('pk', 'category_id', 'meta', 'order'))
+    workitems = visible_workitems(WorkItem.objects.filter(section__portfolio=portfolio), user)
+    workitems = list(workitems.order_by('order', 'id').values_list(
+        'section_id', 'task_id', 'meta', 'order', 'task__completion_days'
+    ))
+    now = timezone.now()
+
+    with transaction.atomic():
+        clone = Portfolio.objects.create(reference=reference, created_by=user, meta=portfolio.meta)
+        copies = Section.create_in_bulk([
+            Section(portfolio=clone, category_id=category_id, created_by=user, meta=meta, order=order)
+            for _pk, category_id, meta, order in sections
+        ], batch_size=BATCH_SIZE)
+        section_pks = {source[0]: copy.pk for source, copy in zip(sections, copies)}
+        WorkItem.create_in_bulk([
+            WorkItem(
+                section_id=section_pks[section_id],
+                task_id=task_id,
+                created_by=user,
+                meta=meta,
+                order=order,
+                expected_date=now + timedelta(days=completion_days) if schedule else None,
+            )
+            for section_id, task_id, meta, order, completion_days in workitems
+            if section_id in section_pks
+        ], batch_size=BATCH_SIZE)
+    return clone
@@ -31,7 +31,7 @@ class WorkItemFilter(django_filters.FilterSet):
 
     class Meta:
         model = WorkItem
-        fields = ('workitem_id', 'assigned_to', 'created', 'completed', 'task')
+        fields = ('workitem_id', 'section', 'assigned_to', 'created', 'completed', 'task')
 
 
 class SectionFilter(django_filters.FilterSet):
@@ -0,0 +1,50 @@
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from portfolio.models import Category, Portfolio, Section, Task
+from portfolio.views import WorkItemViewSet
+from utils.benchmark import measure, rolled_back
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Django command comparing per item workitem POSTs with one list payload"""
+
+    help = 'Time creating workitems with one POST each against one POST of the whole list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workitems', type=int, default=200)
+
+    def _measure(self, label, func, count):
+        elapsed, queries = measure(func)
+        self.stdout.write(f'{label}: {elapsed:.1f} ms, {count / elapsed * 1000:.0f} workitems/s, {queries} queries')
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        count = options['workitems']
+        factory = APIRequestFactory()
+        view = WorkItemViewSet.as_view({'post': 'create'})
+        with rolled_back():
+            user = User.objects.create_user(email='benchmark-bulk@workbound.info', password=None, is_superuser=True)
+            portfolio = Portfolio.objects.create(created_by=user)
+            category = Category.objects.create(title='Benchmark', created_by=user)
+            tasks = Task.objects.bulk_create([
+                Task(title=f'Benchmark {i}', description='', duration=1, created_by=user) for i in range(count)
+            ])
+
+            def post(data):
+                request = factory.post('/api/v1/workitem/', data, format='json')
+                force_authenticate(request, user=user)
+                response = view(request)
+                assert response.status_code == 201, response.data
+
+            def payload(section):
+                return [{'section': section.pk, 'task': task.pk, 'assigned_to': user.pk} for task in tasks]
+
+            one_by_one = Section.objects.create(portfolio=portfolio, category=category, created_by=user)
+            self._measure('one POST per workitem', lambda: [post(item) for item in payload(one_by_one)], count)
+            bulk = Section.objects.create(portfolio=portfolio, category=category, created_by=user)
+            self._measure('one POST with a list', lambda: post(payload(bulk)), count)
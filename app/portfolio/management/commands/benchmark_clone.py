@@ -0,0 +1,46 @@
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from portfolio.clone import clone_portfolio
+from portfolio.models import Category, Portfolio, Section, Task, WorkItem
+from utils.benchmark import measure, rolled_back
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Django command timing the clone of a large portfolio"""
+
+    help = 'Time cloning a portfolio of --sections sections with --workitems workitems each'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sections', type=int, default=50)
+        parser.add_argument('--workitems', type=int, default=100, help='workitems per section')
+        parser.add_argument('--schedule', action='store_true', help='recompute expected dates')
+
+    def _seed(self, user, sections, workitems):
+        portfolio = Portfolio.objects.create(created_by=user)
+        category = Category.objects.create(title='Benchmark', created_by=user)
+        tasks = Task.objects.bulk_create([
+            Task(title=f'Benchmark {w}', description='', duration=1, completion_days=w % 14, created_by=user)
+            for w in range(workitems)
+        ])
+        Section.create_in_bulk([
+            Section(portfolio=portfolio, category=category, created_by=user) for _ in range(sections)
+        ])
+        WorkItem.create_in_bulk([
+            WorkItem(section=section, task=task, created_by=user)
+            for section in portfolio.sections.all() for task in tasks
+        ], batch_size=1000)
+        return portfolio
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        with rolled_back():
+            user = User.objects.create_user(email='benchmark-clone@workbound.info', password=None, is_superuser=True)
+            portfolio = self._seed(user, options['sections'], options['workitems'])
+
+            elapsed, queries = measure(lambda: clone_portfolio(portfolio, user, schedule=options['schedule']))
+            copied = WorkItem.objects.exclude(section__portfolio=portfolio).filter(created_by=user).count()
+            self.stdout.write(f'clone: {elapsed:.1f} ms, {copied} workitems, {queries} queries')
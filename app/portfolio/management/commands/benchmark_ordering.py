@@ -0,0 +1,49 @@
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from portfolio.models import Category, Portfolio, Section, Task, WorkItem
+from portfolio.ordering import bulk_create_ordered
+from utils.benchmark import measure, rolled_back
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Django command timing order assignment as a section fills up"""
+
+    help = 'Time sequential WorkItem inserts into one section, then the same number bulk created'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workitems', type=int, default=10000)
+        parser.add_argument('--window', type=int, default=1000, help='inserts per reported window')
+
+    def _measure(self, label, func, count):
+        elapsed, queries = measure(func)
+        self.stdout.write(f'{label}: {elapsed:.1f} ms, {elapsed / count:.3f} ms per insert, {queries} queries')
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        total, window = options['workitems'], max(1, options['window'])
+        with rolled_back():
+            user = User.objects.create_user(email='benchmark-ordering@workbound.info', password=None)
+            portfolio = Portfolio.objects.create(created_by=user)
+            category = Category.objects.create(title='Benchmark', created_by=user)
+            task = Task.objects.create(title='Benchmark', description='', duration=1, created_by=user)
+            section = Section.objects.create(portfolio=portfolio, category=category, created_by=user)
+
+            def insert(count):
+                for _ in range(count):
+                    WorkItem.objects.create(section=section, task=task, created_by=user)
+
+            # flat timings across windows show the cost does not grow with the section
+            for start in range(0, total, window):
+                count = min(window, total - start)
+                self._measure(f'save() {start + 1}-{start + count}', lambda: insert(count), count)
+
+            other = Section.objects.create(portfolio=portfolio, category=category, created_by=user)
+            workitems = [
+                WorkItem(section=other, task=task, created_by=user, workitem_id=f'wrk_bench_{i}')
+                for i in range(total)
+            ]
+            self._measure('bulk_create_ordered()', lambda: bulk_create_ordered(WorkItem, workitems, 'section'), total)
@@ -0,0 +1,71 @@
+import time
+from typing import Any, Optional
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+
+from portfolio.models import Category, Portfolio, Section, Task, WorkItem
+from utils.pagination import KeysetPagination
+
+PAGE_SIZE = 100
+
+
+class Command(BaseCommand):
+    """Django command comparing deep page latency of OFFSET and keyset pagination on workitems"""
+
+    help = 'Compare OFFSET and keyset pagination latency at increasing page depths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='workitems to create before measuring')
+        parser.add_argument('--depths', type=int, nargs='*', default=[0, 1000, 10000, 100000, 1000000])
+
+    def _seed(self, count):
+        created_by = Portfolio._meta.get_field('created_by').related_model.objects.order_by('pk').first()
+        portfolio = Portfolio.objects.create(created_by=created_by)
+        section = Section.objects.create(
+            portfolio=portfolio,
+            category=Category.objects.create(title='Benchmark', created_by=created_by),
+            created_by=created_by,
+        )
+        task = Task.objects.create(title='Benchmark', description='', duration=1, created_by=created_by)
+        batch = 10000
+        for start in range(0, count, batch):
+            WorkItem.objects.bulk_create([
+                WorkItem(section=section, task=task, workitem_id=f'wrk_bench_{i}', order=i / 10)
+                for i in range(start, min(start + batch, count))
+            ])
+            self.stdout.write(f'seeded {min(start + batch, count)} workitems')
+
+    def _time(self, func):
+        start = time.perf_counter()
+        func()
+        return (time.perf_counter() - start) * 1000
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        if options['seed']:
+            self._seed(options['seed'])
+        queryset = WorkItem.objects.all()
+        total = queryset.count()
+        factory = RequestFactory()
+
+        for depth in options['depths']:
+            if depth >= total:
+                break
+            page = depth // PAGE_SIZE + 1
+            offset = PageNumberPagination()
+            offset.page_size = PAGE_SIZE
+            offset_ms = self._time(lambda: offset.paginate_queryset(
+                queryset, Request(factory.get('/', {'page': page}))
+            ))
+
+            # the cursor of a deep page points at the row just before it
+            last = queryset.order_by('order', 'id').values_list('order', 'id')[depth - 1] if depth else None
+            keyset = KeysetPagination()
+            params = {'size': PAGE_SIZE}
+            if last is not None:
+                params['cursor'] = keyset.encode_cursor(list(last), False)
+            keyset_ms = self._time(lambda: keyset.paginate_queryset(queryset, Request(factory.get('/', params))))
+
+            self.stdout.write(f'row {depth:>9,}: offset {offset_ms:8.1f} ms | keyset {keyset_ms:8.1f} ms')
@@ -0,0 +1,82 @@
+import time
+from typing import Any, Optional
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from utils.renderers import FastJSONRenderer
+
+
+def _user(pk):
+    return {
+        'id': pk,
+        'email': f'user{pk}@workbound.info',
+        'profile': {'first_name': 'First', 'last_name': 'Last', 'phone': '+12125552368', 'image': None, 'thumbnail': None},
+    }
+
+
+def portfolio_tree(portfolios, sections, workitems) -> dict:
+    """Returns a page of portfolios shaped like the expanded portfolio and workitem serializers"""
+    created = '08-01-2021 12:00:00'
+    results = []
+    for p in range(portfolios):
+        results.append({
+            'id': p,
+            'portfolio_id': f'prt_{p:032x}',
+            'reference': f'{p:032x}',
+            'sections': [{
+                'id': s,
+                'section_id': f'sct_{s:032x}',
+                'order': s / 10,
+                'portfolio': p,
+                'category': {'id': s, 'title': 'Category', 'description': '', 'created': created,
+                             'created_by': _user(s), 'archived': None},
+                'created': created,
+                'created_by': _user(p),
+                'meta': {'notes': 'x' * 40},
+                'completed': None,
+                'workitems': [{
+                    'id': w,
+                    'workitem_id': f'wrk_{w:032x}',
+                    'order': w / 10,
+                    'section': s,
+                    'task': {'id': w, 'title': 'Task', 'description': 'y' * 60, 'duration': 5,
+                             'completion_days': 7, 'created': created, 'created_by': _user(w), 'archived': None},
+                    'created': created,
+                    'created_by': _user(p),
+                    'meta': None,
+                    'completed': created,
+                    'assigned_to': _user(w),
+                } for w in range(workitems)],
+            } for s in range(sections)],
+            'created': created,
+            'created_by': _user(p),
+            'meta': None,
+            'completed': None,
+        })
+    return {'count': portfolios, 'next': None, 'previous': None, 'results': results}
+
+
+class Command(BaseCommand):
+    """Django command comparing JSONRenderer with FastJSONRenderer on portfolio trees"""
+
+    help = 'Compare render time of JSONRenderer and FastJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--portfolios', type=int, default=100)
+        parser.add_argument('--sections', type=int, default=5)
+        parser.add_argument('--workitems', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=5, help='runs per renderer, the best is reported')
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        data = portfolio_tree(options['portfolios'], options['sections'], options['workitems'])
+        timings = {}
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            runs = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                size = len(renderer.render(data))
+                runs.append(time.perf_counter() - start)
+            timings[type(renderer).__name__] = min(runs)
+            self.stdout.write(f'{type(renderer).__name__}: {min(runs) * 1000:.1f} ms for {size:,} bytes')
+        self.stdout.write(f'x{timings["JSONRenderer"] / timings["FastJSONRenderer"]:.1f}')
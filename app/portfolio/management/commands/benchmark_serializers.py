@@ -0,0 +1,59 @@
+import time
+from typing import Any, Optional
+
+from django.core.management.base import BaseCommand
+
+from portfolio.serializers import (
+    CategorySerializer, PortfolioSerializer, SectionSerializer, TaskSerializer, WorkItemSerializer
+)
+from utils.compiled import CompiledSerializer
+from utils.queryplan import plan_queryset
+
+SERIALIZERS = {
+    'portfolio': PortfolioSerializer,
+    'section': SectionSerializer,
+    'workitem': WorkItemSerializer,
+    'task': TaskSerializer,
+    'category': CategorySerializer,
+}
+
+
+class Command(BaseCommand):
+    """Django command comparing rows/sec of the serializers and their compiled counterparts"""
+
+    help = 'Compare rows/sec of the portfolio serializers and the compiled read path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', default=list(SERIALIZERS), choices=list(SERIALIZERS))
+        parser.add_argument('--limit', type=int, default=1000, help='rows serialized per run')
+        parser.add_argument('--repeat', type=int, default=5, help='runs per path, the best is reported')
+
+    def _best(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = func()
+            timings.append(time.perf_counter() - start)
+        return count, min(timings)
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        for name in options['models']:
+            serializer_class = SERIALIZERS[name]
+            queryset = serializer_class.Meta.model.objects.order_by('pk')[:options['limit']]
+
+            def serializer_path():
+                return len(serializer_class(plan_queryset(queryset, serializer_class), many=True).data)
+
+            def compiled_path():
+                compiled = CompiledSerializer(serializer_class())
+                return len(compiled.serialize(compiled.values(queryset)))
+
+            count, serializer_time = self._best(serializer_path, options['repeat'])
+            _, compiled_time = self._best(compiled_path, options['repeat'])
+            if not count:
+                self.stdout.write(f'{name}: no rows')
+                continue
+            self.stdout.write(
+                f'{name}: {count} rows | serializer {count / serializer_time:,.0f} rows/s'
+                f' | compiled {count / compiled_time:,.0f} rows/s | x{serializer_time / compiled_time:.1f}'
+            )
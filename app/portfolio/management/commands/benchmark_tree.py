@@ -0,0 +1,56 @@
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from portfolio.models import Category, Portfolio, Section, Task, WorkItem
+from portfolio.serializers import PortfolioSerializer, WorkItemSerializer
+from portfolio.tree import portfolio_tree
+from utils.benchmark import measure, rolled_back
+from utils.queryplan import plan_queryset
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Django command comparing the portfolio tree with the serializer round trips it replaces"""
+
+    help = 'Time /portfolio/{id}/tree/ assembly against PortfolioSerializer plus per-section workitem fetches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sections', type=int, default=100)
+        parser.add_argument('--workitems', type=int, default=100, help='workitems per section')
+
+    def _seed(self, user, sections, workitems):
+        portfolio = Portfolio.objects.create(created_by=user)
+        category = Category.objects.create(title='Benchmark', created_by=user)
+        task = Task.objects.create(title='Benchmark', description='', duration=1, created_by=user)
+        Section.objects.bulk_create([
+            Section(portfolio=portfolio, category=category, created_by=user, section_id=f'sct_bench_{s}', order=s + 1)
+            for s in range(sections)
+        ])
+        WorkItem.objects.bulk_create([
+            WorkItem(section=section, task=task, created_by=user, assigned_to=user,
+                     workitem_id=f'wrk_bench_{section.pk}_{w}', order=w + 1)
+            for section in portfolio.sections.all() for w in range(workitems)
+        ])
+        return portfolio
+
+    def _measure(self, label, func):
+        elapsed, queries = measure(func)
+        self.stdout.write(f'{label}: {elapsed:.1f} ms, {queries} queries')
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        with rolled_back():
+            user = User.objects.create_user(email='benchmark-tree@workbound.info', password=None, is_superuser=True)
+            portfolio = self._seed(user, options['sections'], options['workitems'])
+
+            def serializers():
+                queryset = plan_queryset(Portfolio.objects.filter(pk=portfolio.pk), PortfolioSerializer, inline=True)
+                data = PortfolioSerializer(queryset[0], inline=True).data
+                for section in data['sections']:
+                    queryset = plan_queryset(WorkItem.objects.filter(section=section['id']), WorkItemSerializer)
+                    WorkItemSerializer(queryset, many=True).data
+
+            self._measure('serializers', serializers)
+            self._measure('tree', lambda: portfolio_tree(portfolio, user))
@@ -0,0 +1,88 @@
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from portfolio.models import Category, Portfolio, Section, Task, WorkItem
+from portfolio.visibility import editable_workitems, visible_workitems
+from user.models import Role, RoleType
+from utils.benchmark import measure, rolled_back
+
+User = get_user_model()
+
+PAGE_SIZE = 100
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    """Django command timing row scoped workitem lists on a large table"""
+
+    help = 'Seed --workitems workitems spread over --categories categories and time the scoped list queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workitems', type=int, default=1000000)
+        parser.add_argument('--categories', type=int, default=100)
+        parser.add_argument('--sections', type=int, default=10, help='sections per category')
+        parser.add_argument('--users', type=int, default=100, help='users workitems are assigned to')
+        parser.add_argument('--roles', type=int, default=2, help='categories the measured user holds a role in')
+        parser.add_argument('--explain', action='store_true', help='print the plan of each query')
+
+    def _seed(self, user, options):
+        users = User.objects.bulk_create([
+            User(email=f'benchmark-visibility-{u}@workbound.info') for u in range(options['users'])
+        ])
+        portfolio = Portfolio.objects.create(created_by=user)
+        task = Task.objects.create(title='Benchmark', description='', duration=1, created_by=user)
+        categories = Category.objects.bulk_create([
+            Category(title=f'Benchmark {c}', created_by=user) for c in range(options['categories'])
+        ])
+        sections = Section.objects.bulk_create([
+            Section(portfolio=portfolio, category=category, created_by=users[c % len(users)],
+                    section_id=f'sct_bench_{c}_{s}', order=s + 1)
+            for c, category in enumerate(categories) for s in range(options['sections'])
+        ])
+        total = options['workitems']
+        for start in range(0, total, BATCH_SIZE):
+            WorkItem.objects.bulk_create([
+                WorkItem(
+                    section=sections[i % len(sections)],
+                    task=task,
+                    assigned_to=users[i % len(users)],
+                    workitem_id=f'wrk_bench_{i}',
+                    order=i // len(sections) + 1,
+                )
+                for i in range(start, min(start + BATCH_SIZE, total))
+            ])
+            self.stdout.write(f'seeded {min(start + BATCH_SIZE, total)} workitems')
+
+        # the measured user sees a few categories through roles and a few rows through assignment
+        manager = RoleType.objects.get(name='Manager')
+        Role.objects.bulk_create([
+            Role(user=user, category=category, role_type=manager) for category in categories[:options['roles']]
+        ])
+        WorkItem.objects.filter(pk__in=WorkItem.objects.order_by('-pk').values('pk')[:PAGE_SIZE]).update(assigned_to=user)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _measure(self, label, queryset, explain):
+        elapsed, queries = measure(lambda: list(queryset))
+        self.stdout.write(f'{label}: {elapsed:.1f} ms, {queries} queries')
+        if explain:
+            self.stdout.write(queryset.explain(analyze=True))
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        with rolled_back():
+            user = User.objects.create_user(email='benchmark-visibility@workbound.info', password=None)
+            self._seed(user, options)
+
+            workitems = WorkItem.objects.all()
+            self._measure('unscoped page', workitems[:PAGE_SIZE], options['explain'])
+            self._measure('visible page', visible_workitems(workitems, user)[:PAGE_SIZE], options['explain'])
+            self._measure('editable page', editable_workitems(workitems, user)[:PAGE_SIZE], options['explain'])
+            section = Section.objects.filter(category__role__user=user).first()
+            self._measure(
+                'visible section page',
+                visible_workitems(workitems.filter(section=section), user)[:PAGE_SIZE],
+                options['explain'],
+            )
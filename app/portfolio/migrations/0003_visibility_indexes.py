@@ -0,0 +1,23 @@
+# Generated by Django 3.2.6 on 2026-10-18 11:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('portfolio', '0002_auto_20210729_1250'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['portfolio', 'category'], name='section_portfolio_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workitem',
+            index=models.Index(fields=['assigned_to', 'section'], name='workitem_assigned_section_idx'),
+        ),
+    ]
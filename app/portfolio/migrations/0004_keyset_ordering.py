@@ -0,0 +1,25 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0003_visibility_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='section',
+            options={'ordering': ['order', 'id'], 'verbose_name': 'Section', 'verbose_name_plural': 'Sections'},
+        ),
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['order', 'id'], name='section_order_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workitem',
+            index=models.Index(fields=['order', 'id'], name='workitem_order_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.6 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_keyset_ordering'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['portfolio', 'order', 'id'], name='section_portfolio_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workitem',
+            index=models.Index(fields=['section', 'order', 'id'], name='workitem_section_order_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
+from portfolio.ordering import assign_orders, bulk_create_ordered
 from utils.helpers import make_id
 
 User = get_user_model()
@@ -78,21 +79,29 @@ class Section(models.Model):
 
         verbose_name = "Section"
         verbose_name_plural = "Sections"
-        ordering = ["order"]
-
-    @property
-    def workitem_count(self):
-        return len(self.workitems.all())
+        ordering = ["order", "id"]
+        indexes = [
+            models.Index(fields=["portfolio", "category"], name="section_portfolio_category_idx"),
+            models.Index(fields=["order", "id"], name="section_order_id_idx"),
+            models.Index(fields=["portfolio", "order", "id"], name="section_portfolio_order_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.section_id:
             new_id = make_id()
             self.section_id = self.PREFIX + new_id
-        if not self.order:
-            self.order = (
-                max([x.order for x in self.portfolio.sections.all()], default=0.0) + 0.1
-            )
-        return super(Section, self).save(*args, **kwargs)
+        if self.order:
+            return super(Section, self).save(*args, **kwargs)
+        with transaction.atomic():
+            assign_orders([self], "portfolio")
+            return super(Section, self).save(*args, **kwargs)
+
+    @classmethod
+    def create_in_bulk(cls, objs, **kwargs):
+        """bulk_create() objs with the ids and orders save() would give them"""
+        for obj in objs:
+            obj.section_id = obj.section_id or cls.PREFIX + make_id()
+        return bulk_create_ordered(cls, objs, "portfolio", **kwargs)
 
     def __str__(self) -> str:
         return f"{self.section_id} {self.category.title}"
@@ -156,16 +165,28 @@ class WorkItem(models.Model):
         verbose_name = "Work Item"
         verbose_name_plural = "Work Items"
         ordering = ["order", "id"]
+        indexes = [
+            models.Index(fields=["assigned_to", "section"], name="workitem_assigned_section_idx"),
+            models.Index(fields=["order", "id"], name="workitem_order_id_idx"),
+            models.Index(fields=["section", "order", "id"], name="workitem_section_order_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.workitem_id:
             new_id = make_id()
             self.workitem_id = self.PREFIX + new_id
-        if not self.order:
-            self.order = (
-                max([x.order for x in self.section.workitems.all()], default=0.0) + 0.1
-            )
-        return super(WorkItem, self).save(*args, **kwargs)
+        if self.order:
+            return super(WorkItem, self).save(*args, **kwargs)
+        with transaction.atomic():
+            assign_orders([self], "section")
+            return super(WorkItem, self).save(*args, **kwargs)
+
+    @classmethod
+    def create_in_bulk(cls, objs, **kwargs):
+        """bulk_create() objs with the ids and orders save() would give them"""
+        for obj in objs:
+            obj.workitem_id = obj.workitem_id or cls.PREFIX + make_id()
+        return bulk_create_ordered(cls, objs, "section", **kwargs)
 
     def __str__(self) -> str:
         """Unicode representation of WorkItem."""
@@ -0,0 +1,176 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, transaction
+from django.db.models import F, Max
+
+ORDER_STEP = 0.1
+# neighbours closer than this fraction of their order are rebalanced
+ORDER_MIN_GAP = 1e-9
+
+
+def _lock(model, pks):
+    """Locks the rows of model with pks FOR UPDATE until the transaction ends"""
+    list(model._default_manager.select_for_update().filter(pk__in=pks).order_by('pk').values_list('pk', flat=True))
+
+
+def _siblings(model, field, parent_pk) -> list:
+    """Returns the (pk, order) of the children of parent_pk in display order"""
+    queryset = model._default_manager.filter(**{field.attname: parent_pk})
+    return list(queryset.order_by(F('order').asc(nulls_last=True), 'pk').values_list('pk', 'order'))
+
+
+def assign_orders(objs, parent_field: str):
+    """
+    Gives every object of objs without an order the next orders after the last
+    sibling under its parent. Parents are locked FOR UPDATE, so concurrent
+    inserts into one parent queue instead of reading the same maximum; call it
+    inside the transaction saving objs. The last order of each parent is one
+    probe of the (parent, order, id) index, however many siblings it holds.
+    """
+    objs = list(objs)
+    if not objs:
+        return
+    field = objs[0]._meta.get_field(parent_field)
+    pending = defaultdict(list)
+    for obj in objs:
+        if not obj.order:
+            pending[getattr(obj, field.attname)].append(obj)
+    pending.pop(None, None)
+    if not pending:
+        return
+
+    _lock(field.related_model, pending)
+    siblings = field.model._default_manager.order_by()
+    for parent_pk, children in pending.items():
+        last = siblings.filter(**{field.attname: parent_pk}).aggregate(last=Max('order'))['last'] or 0.0
+        for index, obj in enumerate(children, 1):
+            obj.order = last + index * ORDER_STEP
+
+
+def bulk_create_ordered(model, objs, parent_field: str, **kwargs) -> list:
+    """bulk_create() objs with orders assigned in the same transaction"""
+    objs = list(objs)
+    with transaction.atomic():
+        assign_orders(objs, parent_field)
+        return model._default_manager.bulk_create(objs, **kwargs)
+
+
+def _spread(low, high, count) -> list:
+    """Returns count increasing orders after low and before high, when high is not None"""
+    if high is None:
+        return [low + index * ORDER_STEP for index in range(1, count + 1)]
+    step = (high - low) / (count + 1)
+    return [low + index * step for index in range(1, count + 1)]
+
+
+def _is_tight(orders) -> bool:
+    return any(b - a <= ORDER_MIN_GAP * max(abs(a), abs(b), 1.0) for a, b in zip(orders, orders[1:]))
+
+
+def _fit(sequence, orders, moved):
+    """
+    Returns the new orders of the moved rows of sequence, spread between
+    their unmoved neighbours, or None when sequence can not be kept strictly
+    increasing that way. Rows without an order are placed like moved ones.
+    """
+    new, run, low = {}, [], 0.0
+    for pk in sequence + [None]:
+        if pk is not None and (pk in moved or orders[pk] is None):
+            run.append(pk)
+            continue
+        high = None if pk is None else orders[pk]
+        new.update(zip(run, _spread(low, high, len(run))))
+        run, low = [], high
+    final = [new.get(pk, orders[pk]) for pk in sequence]
+    if any(b <= a for a, b in zip([0.0] + final, final)):
+        return None
+    return new
+
+
+def _renumber(sequence, orders) -> dict:
+    """Returns the orders changed by spacing sequence ORDER_STEP apart"""
+    new = {pk: index * ORDER_STEP for index, pk in enumerate(sequence, 1)}
+    return {pk: order for pk, order in new.items() if orders[pk] != order}
+
+
+def reorder(model, parent_field: str, parent_pk, moves) -> dict:
+    """
+    Applies moves to the children of parent_pk and returns {pk: order} for the
+    rows written. moves are (pk, after) pairs applied in turn, after being the
+    sibling to follow or None for the front. Orders are computed in memory
+    from one read of the siblings and written with one bulk_update(). When the
+    moved rows no longer fit between their neighbours every sibling is
+    renumbered, when the gaps left are close to float precision a rebalance
+    is scheduled for after the commit. Raises ValueError for unknown rows.
+    """
+    field = model._meta.get_field(parent_field)
+    with transaction.atomic():
+        _lock(field.related_model, [parent_pk])
+        siblings = _siblings(model, field, parent_pk)
+        orders = dict(siblings)
+        sequence = [pk for pk, _order in siblings]
+        moved = set()
+        for pk, after in moves:
+            if pk not in orders or pk == after or (after is not None and after not in orders):
+                raise ValueError(f'{pk} can not be moved after {after} in {parent_pk}')
+            sequence.remove(pk)
+            sequence.insert(0 if after is None else sequence.index(after) + 1, pk)
+            moved.add(pk)
+
+        new = _fit(sequence, orders, moved)
+        if new is None:
+            new = _renumber(sequence, orders)
+        elif _is_tight([0.0] + [new.get(pk, orders[pk]) for pk in sequence]):
+            transaction.on_commit(lambda: get_rebalancer().schedule(model, parent_field, parent_pk))
+        model._default_manager.bulk_update([model(pk=pk, order=order) for pk, order in new.items()], ['order'])
+    return new
+
+
+def rebalance(model, parent_field: str, parent_pk) -> int:
+    """Spaces the children of parent_pk ORDER_STEP apart and returns the number of rows updated"""
+    field = model._meta.get_field(parent_field)
+    with transaction.atomic():
+        _lock(field.related_model, [parent_pk])
+        siblings = _siblings(model, field, parent_pk)
+        new = _renumber([pk for pk, _order in siblings], dict(siblings))
+        model._default_manager.bulk_update([model(pk=pk, order=order) for pk, order in new.items()], ['order'])
+    return len(new)
+
+
+class Rebalancer:
+    """Runs rebalance() on a background thread, at most once at a time per parent"""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, model, parent_field: str, parent_pk) -> None:
+        key = (model._meta.label, parent_field, parent_pk)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._rebalance_pending, key, model, parent_field, parent_pk)
+
+    def _rebalance_pending(self, key, model, parent_field, parent_pk):
+        try:
+            rebalance(model, parent_field, parent_pk)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+            # the thread's connection is not closed by the request cycle
+            connection.close()
+
+
+_rebalancer = None
+
+
+def get_rebalancer() -> Rebalancer:
+    """Returns the per worker rebalancer"""
+    global _rebalancer
+    if _rebalancer is None:
+        _rebalancer = Rebalancer()
+    return _rebalancer
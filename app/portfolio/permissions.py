@@ -2,7 +2,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from rest_framework.permissions import BasePermission, DjangoModelPermissions
 
-from user.models import Role, RoleType
+from user.acl import get_category_acl, get_role_level
 
 
 class CustomDjangoModelPermissions(DjangoModelPermissions):
@@ -11,6 +11,14 @@ class CustomDjangoModelPermissions(DjangoModelPermissions):
         self.perms_map['GET'] = ['%(app_label)s.view_%(model_name)s']
 
 
+class ChildModelPermissions(BasePermission):
+    """Requires the change permission on the model of the children an action on their parent writes"""
+
+    def has_permission(self, request, view):
+        model = view.get_child_model()
+        return request.user.has_perm(f'{model._meta.app_label}.change_{model._meta.model_name}')
+
+
 class IsAssigned(BasePermission):
     """
     Object-level permission to only allow assigned user of an object to edit it.
@@ -18,11 +26,8 @@ class IsAssigned(BasePermission):
     message = _('You must be assigned to this object.')
 
     def has_object_permission(self, request, view, obj):
+        if obj.assigned_to_id == request.user.pk:
+            return True
 
-        check_role = Role.objects.filter(
-            user=request.user,
-            category=obj.section.category,
-            role_type=RoleType.objects.get(name='Manager')
-        )
-
-        return obj.assigned_to == request.user or check_role
+        level = get_category_acl(request.user).get(obj.section.category_id)
+        return level is not None and level >= get_role_level('Manager')
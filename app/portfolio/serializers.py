@@ -1,15 +1,19 @@
 from django.contrib.auth import get_user_model
+from django.utils.translation import ugettext_lazy as _
 
 from rest_framework import serializers
 
 from portfolio.models import Portfolio, Section, Category, Task, WorkItem
 from user.serializers import UserSerializer
+from utils.bulk import BulkCreateListSerializer
+from utils.fields import CountField
+from utils.queryplan import NestedRepresentationMixin
 
 
 User = get_user_model()
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(NestedRepresentationMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Task
@@ -24,18 +28,14 @@ class TaskSerializer(serializers.ModelSerializer):
             'archived',
         )
         read_only_fields = ('created', )
+        nested = {'created_by': UserSerializer}
 
     def create(self, validated_data):
         task = Task.objects.create(**validated_data)
         return task
 
-    def to_representation(self, instance):
-        data = super(TaskSerializer, self).to_representation(instance)
-        data['created_by'] = UserSerializer(instance=instance.created_by).data
-        return data
 
-
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(NestedRepresentationMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Category
@@ -48,18 +48,15 @@ class CategorySerializer(serializers.ModelSerializer):
             'archived',
         )
         read_only_fields = ('created', )
+        nested = {'created_by': UserSerializer}
 
     def create(self, validated_data):
         category = Category.objects.create(**validated_data)
         return category
 
-    def to_representation(self, instance):
-        data = super(CategorySerializer, self).to_representation(instance)
-        data['created_by'] = UserSerializer(instance=instance.created_by).data
-        return data
-
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(NestedRepresentationMixin, serializers.ModelSerializer):
+    workitem_count = CountField('workitems')
 
     class Meta:
         model = Section
@@ -74,17 +71,15 @@ class SectionSerializer(serializers.ModelSerializer):
             'meta',
             'completed',
             'workitems',
+            'workitem_count',
         )
         read_only_fields = ('id', 'section_id', 'created', )
-
-    def to_representation(self, instance):
-        data = super(SectionSerializer, self).to_representation(instance)
-        data['created_by'] = UserSerializer(instance=instance.created_by).data
-        data['category'] = CategorySerializer(instance=instance.category).data
-        return data
+        nested = {'created_by': UserSerializer, 'category': CategorySerializer}
+        inline = {'workitems': 'workitem_count'}
+        list_serializer_class = BulkCreateListSerializer
 
 
-class WorkItemSerializer(serializers.ModelSerializer):
+class WorkItemSerializer(NestedRepresentationMixin, serializers.ModelSerializer):
 
     class Meta:
         model = WorkItem
@@ -102,30 +97,59 @@ class WorkItemSerializer(serializers.ModelSerializer):
         )
 
         read_only_fields = ('id', 'workitem_id', 'created', )
+        nested = {
+            'created_by': UserSerializer,
+            'assigned_to': UserSerializer,
+            'task': TaskSerializer,
+            'section': SectionSerializer,
+        }
+        list_serializer_class = BulkCreateListSerializer
 
-    def to_representation(self, instance):
-        data = super(WorkItemSerializer, self).to_representation(instance)
-        data['created_by'] = UserSerializer(instance=instance.created_by).data
-        data['assigned_to'] = UserSerializer(instance=instance.assigned_to).data
-        data['task'] = TaskSerializer(instance=instance.task).data
-        data['section'] = SectionSerializer(instance=instance.section).data
-        return data
 
+class WorkItemBulkUpdateSerializer(serializers.Serializer):
+    """Serializer for the fields a bulk update sets on workitems, meta is merged into the stored meta"""
+    assigned_to = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), allow_null=True, required=False)
+    completed = serializers.DateTimeField(allow_null=True, required=False)
+    expected_date = serializers.DateTimeField(allow_null=True, required=False)
+    meta = serializers.DictField(required=False)
 
-class PortfolioSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(_('Set at least one of {fields}.').format(fields=', '.join(self.fields)))
+        return attrs
+
+
+class PortfolioSerializer(NestedRepresentationMixin, serializers.ModelSerializer):
     """Serializer for portfolio objects"""
     sections = SectionSerializer(many=True, read_only=True)
+    section_count = CountField('sections')
 
     class Meta:
         model = Portfolio
-        fields = ['id', 'portfolio_id', 'reference', 'sections', 'created', 'created_by', 'meta', 'completed', ]
+        fields = [
+            'id', 'portfolio_id', 'reference', 'sections', 'section_count', 'created', 'created_by', 'meta', 'completed',
+        ]
         read_only_fields = ['id', 'portfolio_id', 'created', ]
-
-    def to_representation(self, instance):
-        data = super(PortfolioSerializer, self).to_representation(instance)
-        data['created_by'] = UserSerializer(instance=instance.created_by).data
-        return data
+        nested = {'created_by': UserSerializer}
+        inline = {'sections': 'section_count'}
 
     def create(self, validated_data):
         portfolio = Portfolio.objects.create(**validated_data)
         return portfolio
+
+
+class MoveSerializer(serializers.Serializer):
+    """Serializer for one move of a reorder, id is placed right after after, first when it is null"""
+    id = serializers.IntegerField()
+    after = serializers.IntegerField(allow_null=True)
+
+
+class ReorderSerializer(serializers.Serializer):
+    """Serializer for the moves applied by a reorder, in turn"""
+    moves = MoveSerializer(many=True, allow_empty=False)
+
+
+class PortfolioCloneSerializer(serializers.Serializer):
+    """Serializer for the options of a portfolio clone"""
+    reference = serializers.CharField(max_length=255, allow_null=True, required=False)
+    schedule = serializers.BooleanField(default=False)
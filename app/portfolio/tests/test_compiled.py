@@ -0,0 +1,91 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+
+from rest_framework.renderers import JSONRenderer
+
+from portfolio.models import Category, Portfolio, Section, Task, WorkItem
+from portfolio.serializers import (
+    CategorySerializer, PortfolioSerializer, SectionSerializer, TaskSerializer, WorkItemSerializer
+)
+from portfolio.tests.test_portfolio_api import sample_portfolio
+from portfolio.tests.test_section_api import sample_category
+from portfolio.tests.test_workitem_api import sample_task
+from utils.compiled import CompiledSerializer
+from utils.helpers import sample_email, sample_id
+
+
+User = get_user_model()
+
+
+class CompiledSerializerTests(TestCase):
+    """Test compiled serializers render like the serializers they come from"""
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(email=sample_email(), password=sample_id())
+        self.user.profile.phone = '+12125552368'
+        self.user.profile.first_name = 'Test'
+        self.user.profile.save()
+        for _ in range(2):
+            portfolio = sample_portfolio(user=self.user)
+            for _ in range(2):
+                section = Section.objects.create(
+                    portfolio=portfolio, category=sample_category(), created_by=self.user, meta={'a': [1, 2]}
+                )
+                WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user)
+                WorkItem.objects.create(
+                    section=section, task=sample_task(), created_by=None, assigned_to=self.user
+                )
+        Section.objects.create(portfolio=sample_portfolio(), category=sample_category(), created_by=self.user)
+
+    def _assert_compiled_matches(self, serializer_class, queryset, **kwargs):
+        serializer = serializer_class(queryset, many=True, **kwargs)
+        compiled = CompiledSerializer(serializer)
+
+        expected = JSONRenderer().render(serializer.data)
+        actual = JSONRenderer().render(compiled.serialize(compiled.values(queryset)))
+
+        self.assertEqual(actual, expected)
+
+    def test_compiled_output_matches(self):
+        """Test compiled output is byte identical for every portfolio serializer"""
+        cases = (
+            (PortfolioSerializer, Portfolio),
+            (SectionSerializer, Section),
+            (WorkItemSerializer, WorkItem),
+            (TaskSerializer, Task),
+            (CategorySerializer, Category),
+        )
+        for serializer_class, model in cases:
+            with self.subTest(serializer=serializer_class.__name__):
+                self._assert_compiled_matches(serializer_class, model.objects.order_by('pk'))
+
+    def test_compiled_output_matches_field_trees(self):
+        """Test compiled output honours the fields and expand trees"""
+        self._assert_compiled_matches(
+            WorkItemSerializer,
+            WorkItem.objects.order_by('pk'),
+            fields={'id': {}, 'task': {'title': {}}, 'section': {}, 'assigned_to': {}},
+            expand={'task': {}},
+        )
+
+    def test_compiled_output_matches_inline(self):
+        """Test compiled output matches with child lists inlined instead of counted"""
+        for serializer_class, model in ((PortfolioSerializer, Portfolio), (SectionSerializer, Section)):
+            with self.subTest(serializer=serializer_class.__name__):
+                self._assert_compiled_matches(serializer_class, model.objects.order_by('pk'), inline=True)
+
+    def test_compiled_queries_do_not_grow_with_rows(self):
+        """Test relations are fetched with one query each"""
+        compiled = CompiledSerializer(WorkItemSerializer())
+        # the first two workitems have one created_by and one assigned_to, so
+        # both samples fetch every relation
+        rows = list(compiled.values(WorkItem.objects.order_by('pk')))
+
+        with CaptureQueriesContext(connection) as few:
+            compiled.serialize(rows[:2])
+        with CaptureQueriesContext(connection) as many:
+            compiled.serialize(rows)
+
+        self.assertEqual(len(many), len(few))
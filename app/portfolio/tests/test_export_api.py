@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from portfolio.models import WorkItem
+from portfolio.tests.test_section_api import sample_section
+from portfolio.tests.test_workitem_api import sample_task
+
+from utils.helpers import sample_email, sample_id
+
+
+User = get_user_model()
+
+WORKITEM_EXPORT_URL = reverse('portfolio:workitem-export')
+PORTFOLIO_EXPORT_URL = reverse('portfolio:portfolio-export')
+
+
+class ExportApiTests(TestCase):
+    """Tests streaming export endpoints"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = User.objects.create_user(email=sample_email(), password=sample_id())
+        self.client.force_authenticate(user=self.user)
+        section = sample_section(user=self.user)
+        self.workitems = [
+            WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user) for _ in range(5)
+        ]
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_export_ndjson(self):
+        """Test every visible row is streamed as one JSON line, across chunks"""
+        WorkItem.objects.create(section=sample_section(), task=sample_task())
+
+        res = self.client.get(WORKITEM_EXPORT_URL)
+        lines = b''.join(res.streaming_content).splitlines()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([x['id'] for x in rows], [x.id for x in self.workitems])
+        self.assertEqual(rows[0]['task']['title'], self.workitems[0].task.title)
+
+    def test_export_csv(self):
+        """Test ?format=csv streams a header and relations as ids"""
+        res = self.client.get(WORKITEM_EXPORT_URL, {'format': 'csv', 'workitem_id': self.workitems[1].workitem_id})
+        rows = list(csv.DictReader(io.StringIO(b''.join(res.streaming_content).decode())))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['workitem_id'], self.workitems[1].workitem_id)
+        self.assertEqual(rows[0]['task'], str(self.workitems[1].task_id))
+        self.assertEqual(rows[0]['assigned_to'], '')
+
+    def test_export_portfolios_csv_nested_as_json(self):
+        """Test nested lists are exported as JSON cells"""
+        res = self.client.get(PORTFOLIO_EXPORT_URL, {'format': 'csv', 'fields': 'id,sections.id'})
+        rows = list(csv.DictReader(io.StringIO(b''.join(res.streaming_content).decode())))
+
+        self.assertEqual(list(rows[0]), ['id', 'sections'])
+        self.assertEqual(json.loads(rows[0]['sections']), [{'id': self.workitems[0].section_id}])
@@ -1,6 +1,9 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from portfolio.models import Portfolio, Category, Section, Task, WorkItem
+from portfolio.ordering import bulk_create_ordered, rebalance, reorder
 from portfolio.tests.test_section_api import sample_section
 
 
@@ -102,3 +105,87 @@ class TestWorkModels(TestCase):
         self.assertEqual(bool(workitem.completed), False)
         self.assertIsNotNone(workitem.created)
         self.assertEqual(str(workitem), f"{workitem.workitem_id} {task.title}")
+
+
+class TestOrdering(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create(
+            email="test@workbound.info", password="testpass123"
+        )
+        self.section = sample_section()
+        self.task = Task.objects.create(
+            title="Task", description="", created_by=self.user, duration=1
+        )
+
+    def _workitem(self, **kwargs):
+        return WorkItem.objects.create(task=self.task, section=self.section, created_by=self.user, **kwargs)
+
+    def test_workitems_ordered_after_last_sibling(self):
+        """Test new workitems get the order after the highest one in their section"""
+        first = self._workitem()
+        moved = self._workitem(order=5.0)
+        last = self._workitem()
+
+        self.assertAlmostEqual(first.order, 0.1)
+        self.assertEqual(moved.order, 5.0)
+        self.assertAlmostEqual(last.order, 5.1)
+
+    def test_sections_ordered_per_portfolio(self):
+        """Test section orders only follow the sections of the same portfolio"""
+        sample_section()
+        section = Section.objects.create(
+            portfolio=self.section.portfolio, category=self.section.category, created_by=self.user
+        )
+
+        self.assertAlmostEqual(section.order, self.section.order + 0.1)
+
+    def test_order_queries_do_not_grow_with_siblings(self):
+        """Test assigning an order does not read the siblings"""
+        self._workitem()
+        with CaptureQueriesContext(connection) as few:
+            self._workitem()
+        for _ in range(10):
+            self._workitem()
+        with CaptureQueriesContext(connection) as many:
+            self._workitem()
+
+        self.assertEqual(len(many), len(few))
+
+    def test_bulk_create_ordered(self):
+        """Test bulk created workitems get consecutive orders after existing ones"""
+        self._workitem(order=1.0)
+        workitems = bulk_create_ordered(WorkItem, [
+            WorkItem(task=self.task, section=self.section, created_by=self.user, workitem_id=f"wrk_bulk_{i}")
+            for i in range(3)
+        ], "section")
+
+        self.assertEqual([round(x.order, 6) for x in workitems], [1.1, 1.2, 1.3])
+
+    def test_reorder_between_neighbours(self):
+        """Test a moved workitem gets an order between its new neighbours only"""
+        first, second, third = [self._workitem() for _ in range(3)]
+
+        orders = reorder(WorkItem, "section", self.section.pk, [(third.pk, first.pk)])
+
+        self.assertEqual(list(orders), [third.pk])
+        self.assertTrue(first.order < orders[third.pk] < second.order)
+
+    def test_reorder_renumbers_when_moves_do_not_fit(self):
+        """Test siblings are renumbered when neighbours leave no room"""
+        first, second, third = [self._workitem(order=1.0) for _ in range(3)]
+
+        reorder(WorkItem, "section", self.section.pk, [(first.pk, second.pk)])
+
+        orders = list(self.section.workitems.values_list("pk", "order"))
+        self.assertEqual([pk for pk, _order in orders], [second.pk, first.pk, third.pk])
+        self.assertEqual([round(order, 6) for _pk, order in orders], [0.1, 0.2, 0.3])
+
+    def test_rebalance(self):
+        """Test rebalancing spaces orders evenly and keeps their sequence"""
+        workitems = [self._workitem(order=1.0 + i * 1e-12) for i in range(3)]
+
+        rebalance(WorkItem, "section", self.section.pk)
+
+        orders = list(self.section.workitems.values_list("pk", "order"))
+        self.assertEqual([pk for pk, _order in orders], [x.pk for x in workitems])
+        self.assertEqual([round(order, 6) for _pk, order in orders], [0.1, 0.2, 0.3])
@@ -1,6 +1,12 @@
 import json
 import random
+from datetime import timedelta
+
+import msgpack
+from django.db import connection
+from django.core.cache import cache
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import Permission
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -9,7 +15,7 @@ from django.utils.translation import ugettext_lazy as _
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from portfolio.models import Portfolio, Task, Category
+from portfolio.models import Portfolio, Task, Category, Section, WorkItem
 from portfolio.serializers import PortfolioSerializer
 
 from utils.helpers import sample_id, sample_email
@@ -85,6 +91,7 @@ class PrivatePortfolioApiTests(TestCase):
     """Tests Portfolio API (private)"""
 
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         self.user = _sample_user()
         self.client.force_authenticate(user=self.user)
@@ -92,7 +99,7 @@ class PrivatePortfolioApiTests(TestCase):
     def test_retrieve_portfolios_with_permission(self):
         """Test retrieving portfolios with correct permissions"""
 
-        portfolios = [sample_portfolio() for i in range(2)]
+        portfolios = [sample_portfolio(user=self.user) for i in range(2)]
 
         # add view permission for portfolios
         permission = Permission.objects.get(name='Can view Portfolio')
@@ -158,3 +165,159 @@ class PrivatePortfolioApiTests(TestCase):
         res = self.client.post(PORTFOLIO_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         self.assertEqual(res.data['meta'], meta)
+
+    def test_retrieve_portfolios_msgpack(self):
+        """Test portfolios render as MessagePack with timestamp datetimes"""
+        portfolio = sample_portfolio(user=self.user)
+
+        res = self.client.get(PORTFOLIO_URL, HTTP_ACCEPT='application/msgpack')
+        data = msgpack.unpackb(res.content, timestamp=3)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+        self.assertEqual(data['results'][0]['portfolio_id'], portfolio.portfolio_id)
+        self.assertEqual(data['results'][0]['created'], portfolio.created)
+
+    def test_create_portfolio_msgpack(self):
+        """Test creating a portfolio from a MessagePack body"""
+        self.user.user_permissions.add(Permission.objects.get(name='Can add Portfolio'))
+        payload = {
+            'reference': 'BrandNewPortfolio-000',
+            'created_by': self.user.id,
+            'meta': {'firstkey': 'firstvalue'},
+        }
+
+        res = self.client.post(PORTFOLIO_URL, payload, format='msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Portfolio.objects.get(reference=payload['reference']).meta, payload['meta'])
+
+    def _add_tree(self, portfolio, sections, workitems):
+        for _s in range(sections):
+            section = Section.objects.create(portfolio=portfolio, category=sample_category(), created_by=self.user)
+            for _w in range(workitems):
+                WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user, assigned_to=self.user)
+
+    def test_retrieve_portfolio_tree(self):
+        """Test the tree nests sections, workitems and their relations"""
+        portfolio = sample_portfolio(user=self.user)
+        self._add_tree(portfolio, 2, 3)
+
+        res = self.client.get(reverse('portfolio:portfolio-tree', args=[portfolio.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created_by']['email'], self.user.email)
+        self.assertEqual(len(res.data['sections']), 2)
+        workitem = res.data['sections'][0]['workitems'][0]
+        self.assertEqual(len(res.data['sections'][0]['workitems']), 3)
+        self.assertEqual(workitem['assigned_to']['id'], self.user.id)
+        self.assertEqual(workitem['task']['title'], WorkItem.objects.get(pk=workitem['id']).task.title)
+        self.assertEqual(res.data['sections'][1]['category']['id'], Section.objects.order_by('order', 'id')[1].category_id)
+
+    def test_portfolio_tree_omits_children_not_viewable(self):
+        """Test the tree leaves out what the user may not view"""
+        portfolio = sample_portfolio(user=self.user)
+        self._add_tree(portfolio, 1, 2)
+        self.user.user_permissions.remove(*Permission.objects.filter(name__in=['Can view Work Item', 'Can view Category']))
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+
+        res = self.client.get(reverse('portfolio:portfolio-tree', args=[portfolio.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        section = res.data['sections'][0]
+        self.assertNotIn('workitems', section)
+        self.assertEqual(section['category'], portfolio.sections.get().category_id)
+
+    def test_portfolio_tree_queries_do_not_grow(self):
+        """Test the tree is read with a fixed number of queries"""
+        small, large = sample_portfolio(user=self.user), sample_portfolio(user=self.user)
+        self._add_tree(small, 1, 1)
+        self._add_tree(large, 4, 5)
+        self.client.get(reverse('portfolio:portfolio-tree', args=[small.id]))
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.client.get(reverse('portfolio:portfolio-tree', args=[small.id]))
+        with CaptureQueriesContext(connection) as large_queries:
+            self.client.get(reverse('portfolio:portfolio-tree', args=[large.id]))
+
+        self.assertEqual(len(large_queries), len(small_queries))
+
+    def test_reorder_sections(self):
+        """Test sections of a portfolio are reordered with one request"""
+        portfolio = sample_portfolio(user=self.user)
+        self._add_tree(portfolio, 3, 0)
+        first, second, third = portfolio.sections.all()
+        self.user.user_permissions.add(Permission.objects.get(name='Can change Section'))
+
+        res = self.client.post(
+            reverse('portfolio:portfolio-reorder', args=[portfolio.id]),
+            {'moves': [{'id': first.id, 'after': third.id}]},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(portfolio.sections.values_list('id', flat=True)), [second.id, third.id, first.id])
+
+    def test_reorder_invisible_section_fails(self):
+        """Test moving a section the user can not see is rejected"""
+        portfolio = sample_portfolio(user=self.user)
+        self._add_tree(portfolio, 1, 0)
+        hidden = Section.objects.create(portfolio=portfolio, category=sample_category(), created_by=_sample_user())
+        self.user.user_permissions.add(Permission.objects.get(name='Can change Section'))
+
+        res = self.client.post(
+            reverse('portfolio:portfolio-reorder', args=[portfolio.id]),
+            {'moves': [{'id': hidden.id, 'after': None}]},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_clone_portfolio(self):
+        """Test a clone copies sections and workitems in order with fresh ids"""
+        portfolio = sample_portfolio(user=self.user)
+        self._add_tree(portfolio, 2, 3)
+        self.user.user_permissions.add(Permission.objects.get(name='Can add Portfolio'))
+
+        res = self.client.post(reverse('portfolio:portfolio-clone', args=[portfolio.id]), {'reference': 'Copy'})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        clone = Portfolio.objects.get(pk=res.data['id'])
+        self.assertEqual(clone.reference, 'Copy')
+        self.assertEqual(clone.created_by, self.user)
+        for source, copy in zip(portfolio.sections.all(), clone.sections.all()):
+            self.assertNotEqual(copy.section_id, source.section_id)
+            self.assertEqual((copy.category_id, copy.order), (source.category_id, source.order))
+            self.assertEqual(
+                list(copy.workitems.values_list('task_id', 'order')),
+                list(source.workitems.values_list('task_id', 'order'))
+            )
+            self.assertFalse(copy.workitems.exclude(assigned_to=None).exists())
+        self.assertEqual(WorkItem.objects.filter(section__portfolio=clone).count(), 6)
+
+    def test_clone_portfolio_schedule(self):
+        """Test a scheduled clone sets expected dates from task completion days"""
+        portfolio = sample_portfolio(user=self.user)
+        self._add_tree(portfolio, 1, 2)
+        self.user.user_permissions.add(Permission.objects.get(name='Can add Portfolio'))
+
+        res = self.client.post(reverse('portfolio:portfolio-clone', args=[portfolio.id]), {'schedule': True})
+
+        for workitem in WorkItem.objects.filter(section__portfolio=res.data['id']).select_related('task'):
+            delay = workitem.expected_date - workitem.created - timedelta(days=workitem.task.completion_days)
+            self.assertLess(abs(delay), timedelta(minutes=1))
+
+    def test_clone_portfolio_queries_do_not_grow(self):
+        """Test a clone is written with a fixed number of queries"""
+        small, large = sample_portfolio(user=self.user), sample_portfolio(user=self.user)
+        self._add_tree(small, 1, 1)
+        self._add_tree(large, 4, 5)
+        self.user.user_permissions.add(Permission.objects.get(name='Can add Portfolio'))
+        self.client.post(reverse('portfolio:portfolio-clone', args=[small.id]))
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.client.post(reverse('portfolio:portfolio-clone', args=[small.id]))
+        with CaptureQueriesContext(connection) as large_queries:
+            self.client.post(reverse('portfolio:portfolio-clone', args=[large.id]))
+
+        self.assertEqual(len(large_queries), len(small_queries))
@@ -0,0 +1,84 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from portfolio.models import Section, WorkItem
+from portfolio.tests.test_portfolio_api import sample_portfolio
+from portfolio.tests.test_section_api import sample_category
+from portfolio.tests.test_workitem_api import sample_task
+
+from utils.helpers import sample_email, sample_id
+
+
+User = get_user_model()
+
+PORTFOLIO_URL = reverse('portfolio:portfolio-list')
+SECTION_URL = reverse('portfolio:section-list')
+WORKITEM_URL = reverse('portfolio:workitem-list')
+TASK_URL = reverse('portfolio:task-list')
+CATEGORY_URL = reverse('portfolio:category-list')
+
+
+class ListQueryCountTests(TestCase):
+    """Test list endpoints issue a constant number of queries"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = User.objects.create_user(email=sample_email(), password=sample_id())
+        self.client.force_authenticate(user=self.user)
+
+    def _add_rows(self, count):
+        """Create a portfolio tree with count sections of count workitems"""
+        portfolio = sample_portfolio(user=self.user)
+        for _ in range(count):
+            section = Section.objects.create(
+                portfolio=portfolio, category=sample_category(), created_by=self.user
+            )
+            for _ in range(count):
+                WorkItem.objects.create(
+                    section=section,
+                    task=sample_task(),
+                    created_by=self.user,
+                    assigned_to=User.objects.create_user(email=sample_email(), password=sample_id())
+                )
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(context)
+
+    def _assert_constant_queries(self, url):
+        self._add_rows(1)
+        self._count_queries(url)
+        small = self._count_queries(url)
+
+        self._add_rows(4)
+        large = self._count_queries(url)
+
+        self.assertEqual(small, large)
+
+    def test_portfolio_list_queries_constant(self):
+        """Test portfolio list queries do not grow with rows"""
+        self._assert_constant_queries(PORTFOLIO_URL)
+
+    def test_section_list_queries_constant(self):
+        """Test section list queries do not grow with rows"""
+        self._assert_constant_queries(SECTION_URL)
+
+    def test_workitem_list_queries_constant(self):
+        """Test workitem list queries do not grow with rows"""
+        self._assert_constant_queries(WORKITEM_URL)
+
+    def test_task_list_queries_constant(self):
+        """Test task list queries do not grow with rows"""
+        self._assert_constant_queries(TASK_URL)
+
+    def test_category_list_queries_constant(self):
+        """Test category list queries do not grow with rows"""
+        self._assert_constant_queries(CATEGORY_URL)
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth.models import Permission
 from django.urls import reverse
@@ -8,9 +9,9 @@ from rest_framework.test import APIClient
 from rest_framework import status
 
 from utils.helpers import sample_email, sample_id
-from portfolio.tests.test_portfolio_api import sample_portfolio
+from portfolio.tests.test_portfolio_api import sample_portfolio, sample_task
 
-from portfolio.models import Category, Section
+from portfolio.models import Category, Section, WorkItem
 from portfolio.serializers import SectionSerializer, CategorySerializer
 
 
@@ -66,6 +67,7 @@ class PrivateSectionApiTests(TestCase):
     """Tests Section API (private)"""
 
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         self.user = _sample_user()
         self.client.force_authenticate(user=self.user)
@@ -136,7 +138,7 @@ class PrivateSectionApiTests(TestCase):
     def test_retrieve_sections_with_permission(self):
         """Test retrieving sections with correct permissions"""
 
-        sections = [sample_section() for i in range(2)]
+        sections = [sample_section(user=self.user) for i in range(2)]
 
         # add view permission for sections
         permission = Permission.objects.get(name="Can view Section")
@@ -205,3 +207,133 @@ class PrivateSectionApiTests(TestCase):
         self.assertFalse(exists)
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(res.data, NO_PERMISSION)
+
+    def test_retrieve_sections_render_workitem_count(self):
+        """Test sections carry a workitem count instead of the workitem list"""
+        section = sample_section(user=self.user)
+        for _i in range(3):
+            WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name="Can view Section"))
+
+        res = self.client.get(SECTION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["workitem_count"], 3)
+        self.assertNotIn("workitems", res.data["results"][0])
+
+    def test_retrieve_sections_inline(self):
+        """Test ?inline=true restores the workitem list"""
+        section = sample_section(user=self.user)
+        workitem = WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name="Can view Section"))
+
+        res = self.client.get(SECTION_URL, {"inline": "true"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["workitems"], [workitem.id])
+        self.assertNotIn("workitem_count", res.data["results"][0])
+
+    def test_retrieve_portfolio_sections(self):
+        """Test the nested route lists only the sections of the portfolio, paginated"""
+        portfolio = sample_portfolio(user=self.user)
+        sections = [
+            Section.objects.create(portfolio=portfolio, category=sample_category(), created_by=self.user)
+            for _ in range(3)
+        ]
+        sample_section(user=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name="Can view Section"))
+        url = reverse("portfolio:portfolio-sections", args=[portfolio.id])
+
+        res = self.client.get(url, {"size": 2})
+        following = self.client.get(res.data["next"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [x["id"] for x in res.data["results"] + following.data["results"]], [x.id for x in sections]
+        )
+        self.assertIsNone(following.data["next"])
+
+    def test_retrieve_portfolio_sections_of_invisible_portfolio(self):
+        """Test the nested route is not found for a portfolio the user can not see"""
+        portfolio = sample_portfolio()
+        self.user.user_permissions.add(Permission.objects.get(name="Can view Section"))
+
+        res = self.client.get(reverse("portfolio:portfolio-sections", args=[portfolio.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reorder_workitems(self):
+        """Test moves are applied in turn and the new orders returned"""
+        section = sample_section(user=self.user)
+        first, second, third = [
+            WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user, assigned_to=self.user)
+            for _ in range(3)
+        ]
+        self.user.user_permissions.add(Permission.objects.get(name="Can change Work Item"))
+        payload = {"moves": [{"id": third.id, "after": None}, {"id": first.id, "after": second.id}]}
+
+        res = self.client.post(reverse("portfolio:section-reorder", args=[section.id]), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual({x["id"] for x in res.data["orders"]}, {first.id, third.id})
+        self.assertEqual(list(section.workitems.values_list("id", flat=True)), [third.id, second.id, first.id])
+
+    def test_reorder_workitems_not_editable_fails(self):
+        """Test moving a workitem the user may not edit is rejected"""
+        section = sample_section(user=self.user)
+        mine = WorkItem.objects.create(section=section, task=sample_task(), assigned_to=self.user)
+        hidden = WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name="Can change Work Item"))
+
+        res = self.client.post(
+            reverse("portfolio:section-reorder", args=[section.id]),
+            {"moves": [{"id": hidden.id, "after": mine.id}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(section.workitems.values_list("id", flat=True)), [mine.id, hidden.id])
+
+    def test_reorder_workitems_of_other_section_fails(self):
+        """Test moving a workitem of another section is rejected"""
+        section = sample_section(user=self.user)
+        WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user)
+        other = WorkItem.objects.create(section=sample_section(), task=sample_task(), assigned_to=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name="Can change Work Item"))
+
+        res = self.client.post(
+            reverse("portfolio:section-reorder", args=[section.id]),
+            {"moves": [{"id": other.id, "after": None}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("moves", res.data)
+
+    def test_reorder_workitems_without_permission_fails(self):
+        """Test reordering requires the change permission of workitems"""
+        section = sample_section(user=self.user)
+        workitem = WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user)
+
+        res = self.client.post(
+            reverse("portfolio:section-reorder", args=[section.id]),
+            {"moves": [{"id": workitem.id, "after": None}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_sections(self):
+        """Test a list payload creates every section after the existing ones"""
+        portfolio = sample_portfolio(user=self.user)
+        existing = Section.objects.create(portfolio=portfolio, category=sample_category(), created_by=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name="Can add Section"))
+        payload = [
+            {"portfolio": portfolio.id, "category": sample_category().id, "created_by": self.user.id} for _ in range(2)
+        ]
+
+        res = self.client.post(SECTION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(portfolio.sections.values_list("id", flat=True)), [existing.id] + res.data["ids"])
+        self.assertTrue(all(x.startswith(Section.PREFIX) for x in portfolio.sections.values_list("section_id", flat=True)))
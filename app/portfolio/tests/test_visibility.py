@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from portfolio.models import Portfolio, Section, WorkItem
+from portfolio.tests.test_workitem_api import sample_workitem
+from portfolio.visibility import editable_workitems, visible_portfolios, visible_sections, visible_workitems
+from user.models import Role, RoleType
+
+from utils.helpers import sample_email, sample_id
+
+
+User = get_user_model()
+
+
+class VisibilityTests(TestCase):
+    """Test row level visibility of portfolio objects"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(email=sample_email(), password=sample_id())
+        self.workitem = sample_workitem()
+
+    def test_unrelated_rows_hidden(self):
+        """Test rows the user has no relation to are hidden"""
+        self.assertFalse(visible_workitems(WorkItem.objects.all(), self.user).exists())
+        self.assertFalse(visible_sections(Section.objects.all(), self.user).exists())
+        self.assertFalse(visible_portfolios(Portfolio.objects.all(), self.user).exists())
+
+    def test_assigned_rows_visible(self):
+        """Test a workitem assignment exposes it with its section and portfolio"""
+        self.workitem.assigned_to = self.user
+        self.workitem.save()
+
+        self.assertEqual(list(visible_workitems(WorkItem.objects.all(), self.user)), [self.workitem])
+        self.assertEqual(list(visible_sections(Section.objects.all(), self.user)), [self.workitem.section])
+        self.assertEqual(
+            list(visible_portfolios(Portfolio.objects.all(), self.user)),
+            [self.workitem.section.portfolio]
+        )
+
+    def test_category_role_exposes_rows(self):
+        """Test a role in a category exposes its sections and workitems"""
+        Role.objects.create(
+            user=self.user,
+            category=self.workitem.section.category,
+            role_type=RoleType.objects.get(name='User')
+        )
+
+        self.assertEqual(list(visible_workitems(WorkItem.objects.all(), self.user)), [self.workitem])
+        self.assertEqual(list(visible_sections(Section.objects.all(), self.user)), [self.workitem.section])
+
+    def test_superuser_sees_everything(self):
+        """Test superusers are not scoped"""
+        admin = User.objects.create_superuser(email=sample_email(), password=sample_id())
+
+        self.assertEqual(visible_workitems(WorkItem.objects.all(), admin).count(), 1)
+
+    def test_staff_scoped(self):
+        """Test staff users are scoped like other users"""
+        staff = User.objects.create_user(email=sample_email(), password=sample_id(), is_staff=True)
+
+        self.assertFalse(visible_workitems(WorkItem.objects.all(), staff).exists())
+
+    def test_editable_without_manager_role_type(self):
+        """Test a missing Manager RoleType leaves only assigned rows editable"""
+        Role.objects.create(
+            user=self.user,
+            category=self.workitem.section.category,
+            role_type=RoleType.objects.get(name='User')
+        )
+        RoleType.objects.filter(name='Manager').delete()
+
+        self.assertFalse(editable_workitems(WorkItem.objects.all(), self.user).exists())
@@ -1,5 +1,8 @@
 import random
+from django.db import connection
+from django.core.cache import cache
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import Permission
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -12,6 +15,7 @@ from utils.helpers import sample_email, sample_id
 
 from portfolio.serializers import TaskSerializer, WorkItemSerializer
 from portfolio.models import Task, WorkItem
+from user.models import Role, RoleType
 from portfolio.tests.test_section_api import sample_section
 
 
@@ -77,6 +81,7 @@ class PrivateWorkItemApiTests(TestCase):
     """Tests WorkItem API (private)"""
 
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         self.user = _sample_user()
         self.client.force_authenticate(user=self.user)
@@ -157,7 +162,7 @@ class PrivateWorkItemApiTests(TestCase):
     def test_retrieve_workitem_with_permission_successful(self):
         """Test retrieving WorkItem(s) with correct permissions"""
 
-        workitems = [sample_workitem() for i in range(2)]
+        workitems = [sample_workitem(user=self.user) for i in range(2)]
 
         # add view permission for sections
         permission = Permission.objects.get(name='Can view Work Item')
@@ -227,3 +232,219 @@ class PrivateWorkItemApiTests(TestCase):
         self.assertFalse(exists)
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(res.data, NO_PERMISSION)
+
+    def test_retrieve_workitems_sparse_fields(self):
+        """Test ?fields= limits the fields of each workitem"""
+        sample_workitem(user=self.user)
+
+        res = self.client.get(WORKITEM_URL, {'fields': 'id,workitem_id,task.title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data['results'][0]), {'id', 'workitem_id', 'task'})
+        self.assertEqual(set(res.data['results'][0]['task']), {'title'})
+
+    def test_retrieve_workitems_opt_in_expansion(self):
+        """Test ?expand= only nests the requested relations"""
+        workitem = sample_workitem(user=self.user)
+
+        res = self.client.get(WORKITEM_URL, {'expand': 'task'})
+
+        result = res.data['results'][0]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(result['task']['id'], workitem.task.id)
+        self.assertEqual(result['section'], workitem.section.id)
+        self.assertEqual(result['created_by'], self.user.id)
+
+    def test_retrieve_workitems_included_envelope(self):
+        """Test ?envelope=included side-loads each related object once"""
+        task = sample_task(user=self.user)
+        section = sample_section()
+        for _i in range(3):
+            WorkItem.objects.create(section=section, task=task, created_by=self.user)
+
+        res = self.client.get(WORKITEM_URL, {'envelope': 'included'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual({x['task'] for x in res.data['results']}, {task.id})
+        self.assertEqual([x['id'] for x in res.data['included']['tasks']], [task.id])
+        self.assertEqual([x['id'] for x in res.data['included']['sections']], [section.id])
+        self.assertEqual(res.data['included']['categories'][0]['id'], section.category_id)
+        self.assertEqual(
+            {x['id'] for x in res.data['included']['users']},
+            {self.user.id, section.created_by_id, section.category.created_by_id}
+        )
+
+    def test_retrieve_workitems_included_by_accept_header(self):
+        """Test the included envelope can be requested through Accept"""
+        sample_workitem(user=self.user)
+
+        res = self.client.get(WORKITEM_URL, HTTP_ACCEPT='application/json; envelope=included')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('included', res.data)
+
+    def test_retrieve_workitems_keyset_pages(self):
+        """Test next and previous cursors walk the (order, id) ordering"""
+        section = sample_section()
+        workitems = [WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user) for _ in range(5)]
+        WorkItem.objects.filter(pk=workitems[3].pk).update(order=workitems[2].order)
+        expected = [x.id for x in WorkItem.objects.filter(created_by=self.user).order_by('order', 'id')]
+
+        pages, url = [], WORKITEM_URL + '?size=2'
+        while url:
+            res = self.client.get(url)
+            pages.append([x['id'] for x in res.data['results']])
+            url = res.data['next']
+
+        self.assertEqual(pages, [expected[:2], expected[2:4], expected[4:]])
+        res = self.client.get(res.data['previous'])
+        self.assertEqual([x['id'] for x in res.data['results']], expected[2:4])
+        self.assertNotIn('count', res.data)
+
+    def test_retrieve_workitems_size_capped(self):
+        """Test ?size= can not exceed MAX_PAGE_SIZE"""
+        for _i in range(3):
+            sample_workitem(user=self.user)
+
+        with self.settings(MAX_PAGE_SIZE=2):
+            res = self.client.get(WORKITEM_URL, {'size': 100})
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_retrieve_section_workitems(self):
+        """Test the nested route lists only the workitems of the section"""
+        section = sample_section(user=self.user)
+        workitems = [WorkItem.objects.create(section=section, task=sample_task(), created_by=self.user) for _ in range(2)]
+        sample_workitem(user=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name='Can view Work Item'))
+
+        res = self.client.get(reverse('portfolio:section-workitems', args=[section.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([x['id'] for x in res.data['results']], [x.id for x in workitems])
+
+    def test_retrieve_section_workitems_of_invisible_section(self):
+        """Test the nested route is not found for a section the user can not see"""
+        section = sample_section()
+        self.user.user_permissions.add(Permission.objects.get(name='Can view Work Item'))
+
+        res = self.client.get(reverse('portfolio:section-workitems', args=[section.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def _bulk_payload(self, section, count):
+        return [{'section': section.id, 'task': sample_task().id, 'assigned_to': self.user.id} for _ in range(count)]
+
+    def test_bulk_create_workitems(self):
+        """Test a list payload creates every workitem with ids and orders"""
+        section = sample_section(user=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name='Can add Work Item'))
+
+        res = self.client.post(WORKITEM_URL, self._bulk_payload(section, 3), format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 3)
+        workitems = list(section.workitems.all())
+        self.assertEqual([x.id for x in workitems], res.data['ids'])
+        self.assertTrue(all(x.workitem_id.startswith(WorkItem.PREFIX) for x in workitems))
+        self.assertEqual([round(x.order, 6) for x in workitems], [0.1, 0.2, 0.3])
+        self.assertEqual({x.created_by_id for x in workitems}, {self.user.id})
+
+    def test_bulk_create_workitems_queries_do_not_grow(self):
+        """Test related objects are validated and rows inserted with a fixed number of queries"""
+        section = sample_section(user=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name='Can add Work Item'))
+        few, many = self._bulk_payload(section, 2), self._bulk_payload(section, 20)
+        self.client.post(WORKITEM_URL, self._bulk_payload(section, 1), format='json')
+
+        with CaptureQueriesContext(connection) as few_queries:
+            self.client.post(WORKITEM_URL, few, format='json')
+        with CaptureQueriesContext(connection) as many_queries:
+            self.client.post(WORKITEM_URL, many, format='json')
+
+        self.assertEqual(len(many_queries), len(few_queries))
+
+    def test_bulk_create_workitems_invalid_item_creates_nothing(self):
+        """Test one unknown task rejects the whole payload"""
+        section = sample_section(user=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name='Can add Work Item'))
+        payload = self._bulk_payload(section, 2) + [{'section': section.id, 'task': 0}]
+
+        res = self.client.post(WORKITEM_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('task', res.data[2])
+        self.assertFalse(section.workitems.exists())
+
+    def test_bulk_create_workitems_limited(self):
+        """Test payloads above BULK_CREATE_MAX_ITEMS are rejected"""
+        section = sample_section(user=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name='Can add Work Item'))
+
+        with self.settings(BULK_CREATE_MAX_ITEMS=2):
+            res = self.client.post(WORKITEM_URL, self._bulk_payload(section, 3), format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(section.workitems.exists())
+
+    def test_bulk_update_workitems(self):
+        """Test a bulk update sets fields and merges meta on the filtered workitems"""
+        section = sample_section()
+        workitems = [
+            WorkItem.objects.create(section=section, task=sample_task(), assigned_to=self.user, meta={'a': 1})
+            for _ in range(3)
+        ]
+        untouched = WorkItem.objects.create(section=sample_section(), task=sample_task(), assigned_to=self.user)
+        self.user.user_permissions.add(Permission.objects.get(name='Can change Work Item'))
+        url = reverse('portfolio:workitem-bulk') + f'?section={section.id}'
+
+        res = self.client.patch(url, {'completed': '2021-08-01T12:00:00Z', 'meta': {'b': 2}}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'updated': 3})
+        for workitem in workitems:
+            workitem.refresh_from_db()
+            self.assertIsNotNone(workitem.completed)
+            self.assertEqual(workitem.meta, {'a': 1, 'b': 2})
+        untouched.refresh_from_db()
+        self.assertIsNone(untouched.completed)
+
+    def test_bulk_update_workitems_scoped_to_editable_rows(self):
+        """Test only workitems the user is assigned to or manages are updated"""
+        section = sample_section()
+        other = _sample_user()
+        mine = WorkItem.objects.create(section=section, task=sample_task(), assigned_to=self.user)
+        theirs = WorkItem.objects.create(section=section, task=sample_task(), assigned_to=other)
+        self.user.user_permissions.add(Permission.objects.get(name='Can change Work Item'))
+        url = reverse('portfolio:workitem-bulk') + f'?section={section.id}'
+
+        res = self.client.patch(url, {'expected_date': '2021-09-01T00:00:00Z'}, format='json')
+
+        self.assertEqual(res.data, {'updated': 1})
+        self.assertIsNotNone(WorkItem.objects.get(pk=mine.pk).expected_date)
+        self.assertIsNone(WorkItem.objects.get(pk=theirs.pk).expected_date)
+
+    def test_bulk_update_workitems_reassign_as_manager(self):
+        """Test a category manager reassigns the workitems of another user in batches"""
+        section = sample_section()
+        other = _sample_user()
+        for _i in range(3):
+            WorkItem.objects.create(section=section, task=sample_task(), assigned_to=other)
+        Role.objects.create(user=self.user, category=section.category, role_type=RoleType.objects.get(name='Manager'))
+        self.user.user_permissions.add(Permission.objects.get(name='Can change Work Item'))
+        url = reverse('portfolio:workitem-bulk') + f'?section={section.id}&assigned_to={other.id}'
+
+        with self.settings(BULK_UPDATE_BATCH_SIZE=2):
+            res = self.client.patch(url, {'assigned_to': self.user.id}, format='json')
+
+        self.assertEqual(res.data, {'updated': 3})
+        self.assertEqual(set(section.workitems.values_list('assigned_to', flat=True)), {self.user.id})
+
+    def test_bulk_update_workitems_requires_filter(self):
+        """Test a bulk update without a filter is rejected"""
+        self.user.user_permissions.add(Permission.objects.get(name='Can change Work Item'))
+
+        res = self.client.patch(reverse('portfolio:workitem-bulk'), {'completed': None}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
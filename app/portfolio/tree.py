@@ -0,0 +1,83 @@
+from portfolio.models import Category, Section, Task, WorkItem
+from portfolio.serializers import (
+    CategorySerializer, PortfolioSerializer, SectionSerializer, TaskSerializer, WorkItemSerializer
+)
+from portfolio.visibility import visible_sections, visible_workitems
+from user.serializers import UserSerializer
+from utils.compiled import CompiledSerializer
+
+
+def _flat(serializer_class, exclude=()):
+    """Returns a compiled serializer_class rendering relations as ids, without exclude"""
+    fields = {name: {} for name in serializer_class.Meta.fields if name not in exclude}
+    return CompiledSerializer(serializer_class(fields=fields, expand={}))
+
+
+def _by_pk(compiled, ids) -> dict:
+    return compiled.fetch(pk__in=set(ids) - {None})
+
+
+def _can_view(user, model) -> bool:
+    return user.has_perm(f'portfolio.view_{model._meta.model_name}')
+
+
+def portfolio_tree(portfolio, user) -> dict:
+    """
+    Returns portfolio with its sections, their workitems and every task,
+    category and user they reference nested in place. Each model is read
+    with one query and the document is assembled from dicts keyed by id,
+    so the number of queries does not depend on the size of the tree.
+    Sections and workitems are scoped to the ones visible to user. Child
+    collections user may not view are left out, and tasks and categories
+    user may not view are left as ids.
+    """
+    data = dict(PortfolioSerializer(portfolio, fields={
+        name: {} for name in PortfolioSerializer.Meta.fields if name not in ('sections', 'section_count')
+    }, expand={}).data)
+    view_sections = _can_view(user, Section)
+    view_workitems = view_sections and _can_view(user, WorkItem)
+
+    sections, workitems = [], []
+    if view_sections:
+        sections_compiled = _flat(SectionSerializer, exclude=('workitems', 'workitem_count'))
+        sections = sections_compiled.serialize(
+            sections_compiled.values(visible_sections(Section.objects.filter(portfolio=portfolio), user))
+        )
+    if view_workitems:
+        workitems_compiled = _flat(WorkItemSerializer)
+        workitems = workitems_compiled.serialize(
+            workitems_compiled.values(visible_workitems(WorkItem.objects.filter(section__portfolio=portfolio), user))
+        )
+
+    tasks = _by_pk(_flat(TaskSerializer), (x['task'] for x in workitems)) if _can_view(user, Task) else {}
+    categories = _by_pk(_flat(CategorySerializer), (x['category'] for x in sections)) if _can_view(user, Category) else {}
+    users = _by_pk(CompiledSerializer(UserSerializer()), [
+        data['created_by'],
+        *(x['created_by'] for x in tasks.values()),
+        *(x['created_by'] for x in categories.values()),
+        *(x['created_by'] for x in sections),
+        *(x[name] for x in workitems for name in ('created_by', 'assigned_to')),
+    ])
+
+    for task in tasks.values():
+        task['created_by'] = users.get(task['created_by'])
+    for category in categories.values():
+        category['created_by'] = users.get(category['created_by'])
+
+    workitems_by_section = {}
+    for workitem in workitems:
+        workitem['task'] = tasks.get(workitem['task'], workitem['task'])
+        workitem['created_by'] = users.get(workitem['created_by'])
+        workitem['assigned_to'] = users.get(workitem['assigned_to'])
+        workitems_by_section.setdefault(workitem['section'], []).append(workitem)
+
+    for section in sections:
+        section['category'] = categories.get(section['category'], section['category'])
+        section['created_by'] = users.get(section['created_by'])
+        if view_workitems:
+            section['workitems'] = workitems_by_section.get(section['id'], [])
+
+    data['created_by'] = users.get(data['created_by'])
+    if view_sections:
+        data['sections'] = sections
+    return data
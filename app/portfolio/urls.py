@@ -13,6 +13,16 @@ router.register('task', views.TaskViewSet)
 router.register('workitem', views.WorkItemViewSet)
 
 urlpatterns = [
+    path(
+        'portfolio/<int:portfolio_pk>/sections/',
+        views.PortfolioSectionViewSet.as_view({'get': 'list'}),
+        name='portfolio-sections',
+    ),
+    path(
+        'section/<int:section_pk>/workitems/',
+        views.SectionWorkItemViewSet.as_view({'get': 'list'}),
+        name='section-workitems',
+    ),
     path('', include(router.urls)),
     path('alt-task/', views.AltTaskViewSet.as_view({'get': 'list'}), name='alt-task-list'),
 ]
@@ -1,60 +1,167 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.filters import OrderingFilter, SearchFilter
-from auth.authentication import FirebaseAuthentication
+from auth.authentication import FirebaseAuthentication, SessionTokenAuthentication
 from portfolio.models import Portfolio, Section, Category, Task, WorkItem
 from portfolio.serializers import (
+    PortfolioCloneSerializer,
     PortfolioSerializer,
+    ReorderSerializer,
     SectionSerializer,
     CategorySerializer,
     TaskSerializer,
+    WorkItemBulkUpdateSerializer,
     WorkItemSerializer,
 )
-from portfolio.permissions import CustomDjangoModelPermissions
+from portfolio.clone import clone_portfolio
+from portfolio.ordering import reorder
+from portfolio.permissions import ChildModelPermissions, CustomDjangoModelPermissions
 from portfolio.filters import PortfolioFilter, SectionFilter, WorkItemFilter
+from portfolio.tree import portfolio_tree
+from portfolio.visibility import editable_workitems, visible_portfolios, visible_sections, visible_workitems
+from utils.bulk import BulkCreateMixin, BulkUpdateMixin
+from utils.compiled import CompiledListMixin
+from utils.export import ExportMixin
+from utils.pagination import CountedPageNumberPagination, KeysetPagination
+from utils.queryplan import QueryPlanMixin
+from utils.sideload import IncludedEnvelopeMixin
 
 
 User = get_user_model()
 
 
-class CustomPageNumberPagination(PageNumberPagination):
+class CustomPageNumberPagination(CountedPageNumberPagination):
     page_size_query_param = "size"  # items per page
+    max_page_size = settings.MAX_PAGE_SIZE
 
 
-class PortfolioViewSet(viewsets.ModelViewSet):
+class ReorderMixin:
+    """
+    Adds a reorder action moving the children of the parent's
+    ``reorder_relation`` with one bulk update.
+    """
+
+    reorder_relation = None
+
+    def get_child_model(self):
+        return self.queryset.model._meta.get_field(self.reorder_relation).related_model
+
+    def get_reorder_parent(self):
+        """Returns the parent the request may reorder, visible to the user"""
+        return self.get_object()
+
+    def get_reorder_queryset(self):
+        """Returns the children the user may move"""
+        return self.get_child_model()._default_manager.all()
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, ChildModelPermissions])
+    def reorder(self, request, pk=None):
+        """Move children after siblings and return the orders written"""
+        parent = self.get_reorder_parent()
+        serializer = ReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        parent_field = self.queryset.model._meta.get_field(self.reorder_relation).field.name
+        moves = [(move['id'], move['after']) for move in serializer.validated_data['moves']]
+        movable = set(self.get_reorder_queryset().filter(
+            **{parent_field: parent.pk, 'pk__in': [pk for pk, _after in moves]}
+        ).values_list('pk', flat=True))
+        for pk, after in moves:
+            # rows the user may not move are refused like rows that do not exist
+            if pk not in movable:
+                raise ValidationError({'moves': [f'{pk} can not be moved after {after} in {parent.pk}']})
+        try:
+            orders = reorder(self.get_child_model(), parent_field, parent.pk, moves)
+        except ValueError as exc:
+            raise ValidationError({'moves': [str(exc)]})
+        return Response({'orders': [{'id': pk, 'order': order} for pk, order in orders.items()]})
+
+
+class PortfolioViewSet(
+    ReorderMixin, ExportMixin, IncludedEnvelopeMixin, CompiledListMixin, QueryPlanMixin, viewsets.ModelViewSet
+):
     """Manage Portfolios in the database"""
 
-    authentication_classes = (FirebaseAuthentication,)
+    authentication_classes = (SessionTokenAuthentication, FirebaseAuthentication)
     permission_classes = (IsAuthenticated, CustomDjangoModelPermissions)
     queryset = Portfolio.objects.all()
     serializer_class = PortfolioSerializer
     filterset_class = PortfolioFilter
+    reorder_relation = 'sections'
+
+    def get_queryset(self):
+        return visible_portfolios(super(PortfolioViewSet, self).get_queryset(), self.request.user)
+
+    def get_reorder_queryset(self):
+        return visible_sections(Section.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    @action(detail=True, methods=['get'])
+    def tree(self, request, pk=None):
+        """Return the portfolio with its sections, workitems and what they reference nested"""
+        # the planned queryset would prefetch what the tree reads itself
+        portfolio = get_object_or_404(visible_portfolios(Portfolio.objects.all(), request.user), pk=pk)
+        self.check_object_permissions(request, portfolio)
+        return Response(portfolio_tree(portfolio, request.user))
+
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """Copy the portfolio with its sections and workitems into a new portfolio"""
+        portfolio = get_object_or_404(visible_portfolios(Portfolio.objects.all(), request.user), pk=pk)
+        self.check_object_permissions(request, portfolio)
+        options = PortfolioCloneSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        clone = clone_portfolio(portfolio, request.user, **options.validated_data)
+        return Response(self.get_serializer(clone).data, status=status.HTTP_201_CREATED)
+
 
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(
+    BulkCreateMixin, ReorderMixin, ExportMixin, IncludedEnvelopeMixin, CompiledListMixin, QueryPlanMixin, viewsets.ModelViewSet
+):
     """Manage Sections in the database"""
 
-    authentication_classes = (FirebaseAuthentication,)
+    authentication_classes = (SessionTokenAuthentication, FirebaseAuthentication)
     permission_classes = (IsAuthenticated, CustomDjangoModelPermissions)
     queryset = Section.objects.all()
     serializer_class = SectionSerializer
     filterset_class = SectionFilter
+    pagination_class = KeysetPagination
+    reorder_relation = 'workitems'
+
+    def get_queryset(self):
+        return visible_sections(super(SectionViewSet, self).get_queryset(), self.request.user)
+
+    def get_reorder_queryset(self):
+        return editable_workitems(WorkItem.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class PortfolioSectionViewSet(SectionViewSet):
+    """List the Sections of one Portfolio"""
+
+    def get_queryset(self):
+        return super(PortfolioSectionViewSet, self).get_queryset().filter(portfolio_id=self.kwargs['portfolio_pk'])
+
+    def list(self, request, *args, **kwargs):
+        get_object_or_404(visible_portfolios(Portfolio.objects.all(), request.user), pk=self.kwargs['portfolio_pk'])
+        return super(PortfolioSectionViewSet, self).list(request, *args, **kwargs)
+
+
+class CategoryViewSet(IncludedEnvelopeMixin, CompiledListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """Manage Sections in the database"""
 
-    authentication_classes = (FirebaseAuthentication,)
+    authentication_classes = (SessionTokenAuthentication, FirebaseAuthentication)
     permission_classes = (IsAuthenticated, CustomDjangoModelPermissions)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -81,10 +188,10 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(data={"status": f"Category {category.id} has been archived"})
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(IncludedEnvelopeMixin, CompiledListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """Manage Tasks in the database"""
 
-    authentication_classes = (FirebaseAuthentication,)
+    authentication_classes = (SessionTokenAuthentication, FirebaseAuthentication)
     permission_classes = (IsAuthenticated, CustomDjangoModelPermissions)
     pagination_class = CustomPageNumberPagination
     queryset = Task.objects.all()
@@ -112,7 +219,7 @@ class TaskViewSet(viewsets.ModelViewSet):
 
 
 class AltTaskViewSet(viewsets.GenericViewSet):
-    authentication_classes = (FirebaseAuthentication,)
+    authentication_classes = (SessionTokenAuthentication, FirebaseAuthentication)
     permission_classes = (IsAuthenticated, CustomDjangoModelPermissions)
     pagination_class = CustomPageNumberPagination
     filter_backends = [OrderingFilter, SearchFilter]
@@ -128,14 +235,41 @@ class AltTaskViewSet(viewsets.GenericViewSet):
         return Response(data={"tasks": data}, status=status.HTTP_200_OK)
 
 
-class WorkItemViewSet(viewsets.ModelViewSet):
+class WorkItemViewSet(
+    BulkCreateMixin,
+    BulkUpdateMixin,
+    ExportMixin,
+    IncludedEnvelopeMixin,
+    CompiledListMixin,
+    QueryPlanMixin,
+    viewsets.ModelViewSet,
+):
     """Manage WorkItems in the database"""
 
-    authentication_classes = (FirebaseAuthentication,)
+    authentication_classes = (SessionTokenAuthentication, FirebaseAuthentication)
     permission_classes = (IsAuthenticated, CustomDjangoModelPermissions)
     queryset = WorkItem.objects.all()
     serializer_class = WorkItemSerializer
     filterset_class = WorkItemFilter
+    pagination_class = KeysetPagination
+    bulk_update_serializer_class = WorkItemBulkUpdateSerializer
+
+    def get_queryset(self):
+        return visible_workitems(super(WorkItemViewSet, self).get_queryset(), self.request.user)
+
+    def get_bulk_update_queryset(self):
+        return editable_workitems(super(WorkItemViewSet, self).get_bulk_update_queryset(), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
+
+
+class SectionWorkItemViewSet(WorkItemViewSet):
+    """List the WorkItems of one Section"""
+
+    def get_queryset(self):
+        return super(SectionWorkItemViewSet, self).get_queryset().filter(section_id=self.kwargs['section_pk'])
+
+    def list(self, request, *args, **kwargs):
+        get_object_or_404(visible_sections(Section.objects.all(), request.user), pk=self.kwargs['section_pk'])
+        return super(SectionWorkItemViewSet, self).list(request, *args, **kwargs)
@@ -0,0 +1,67 @@
+from django.db.models import Exists, OuterRef, Q
+
+from portfolio.models import Section, WorkItem
+from user.acl import get_category_ids, get_role_level
+from user.models import Role
+
+
+def sees_everything(user) -> bool:
+    # is_staff only grants the admin site, it does not widen visibility
+    return user.is_superuser
+
+
+def _workitem_roles(user, min_level: float = None):
+    """EXISTS over user's roles in the category of the outer workitem's section, served by the role index"""
+    roles = Role.objects.filter(user_id=user.pk, category_id=OuterRef('section__category_id'))
+    if min_level is not None:
+        roles = roles.filter(role_type__level__gte=min_level)
+    return Exists(roles)
+
+
+def visible_workitems(queryset, user):
+    """WorkItems user is assigned to, created, or whose category user holds a role in"""
+    if sees_everything(user):
+        return queryset
+    return queryset.filter(
+        Q(assigned_to_id=user.pk)
+        | Q(created_by_id=user.pk)
+        | _workitem_roles(user)
+    )
+
+
+def editable_workitems(queryset, user):
+    """WorkItems user is assigned to or manages through a category role, the rows IsAssigned lets user edit"""
+    if sees_everything(user):
+        return queryset
+    return queryset.filter(
+        Q(assigned_to_id=user.pk)
+        | _workitem_roles(user, get_role_level('Manager'))
+    )
+
+
+def visible_sections(queryset, user):
+    """Sections user created, holds a role in, or has a workitem assigned in"""
+    if sees_everything(user):
+        return queryset
+    assigned = WorkItem.objects.filter(section_id=OuterRef('pk'), assigned_to_id=user.pk)
+    return queryset.filter(
+        Exists(assigned)
+        | Q(created_by_id=user.pk)
+        | Q(category_id__in=get_category_ids(user))
+    )
+
+
+def visible_portfolios(queryset, user):
+    """Portfolios user created or that contain a section or workitem visible through a role or assignment"""
+    if sees_everything(user):
+        return queryset
+    sections = Section.objects.filter(
+        Q(created_by_id=user.pk) | Q(category_id__in=get_category_ids(user)),
+        portfolio_id=OuterRef('pk'),
+    )
+    assigned = WorkItem.objects.filter(section__portfolio_id=OuterRef('pk'), assigned_to_id=user.pk)
+    return queryset.filter(
+        Exists(sections)
+        | Exists(assigned)
+        | Q(created_by_id=user.pk)
+    )
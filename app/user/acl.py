@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+
+from user.models import Role, RoleType
+from user.perms import CATEGORY_ACL_KEY, get_role_type_version
+
+
+def get_role_level(name: str) -> float:
+    """Returns the level of the RoleType called name, or infinity, which no role reaches, if there is none"""
+    key = f'role_level:{name}:{get_role_type_version()}'
+    level = cache.get(key)
+    if level is None:
+        level = RoleType.objects.filter(name=name).values_list('level', flat=True).first()
+        if level is None:
+            level = float('inf')
+        cache.set(key, level, timeout=None)
+    return level
+
+
+def get_category_acl(user) -> dict:
+    """
+    Returns a mapping of category id to user's highest role level in it.
+    The map is materialized in the cache and dropped whenever one of the
+    user's roles or any RoleType is written.
+    """
+    key = CATEGORY_ACL_KEY.format(user.pk, get_role_type_version())
+    acl = cache.get(key)
+    if acl is None:
+        rows = (
+            Role.objects.filter(user_id=user.pk)
+            .values('category_id')
+            .annotate(level=Max('role_type__level'))
+            .order_by()
+        )
+        acl = {row['category_id']: row['level'] for row in rows}
+        cache.set(key, acl, timeout=getattr(settings, 'PERMISSION_CACHE_TTL', 3600))
+    return acl
+
+
+def get_category_ids(user, min_level: float = None) -> list:
+    """Returns ids of categories where user holds a role of at least min_level"""
+    acl = get_category_acl(user)
+    if min_level is None:
+        return list(acl)
+    return [category_id for category_id, level in acl.items() if level >= min_level]
+
+
+def scope_by_category(queryset, user, min_level: float = None, lookup: str = 'category'):
+    """
+    Restricts queryset to rows whose category, reached through lookup, is one
+    where user holds a role of at least min_level.
+    """
+    return queryset.filter(**{f'{lookup}__in': get_category_ids(user, min_level)})
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from user.perms import PERM_SET_KEY, get_perm_version
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose permission sets are shared across requests and
+    workers through the Django cache. Entries are keyed by the user's
+    permission version so any change to their permissions, groups or group
+    permissions makes the cached set unreachable.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            key = PERM_SET_KEY.format(user_obj.pk, get_perm_version(user_obj.pk))
+            perms = cache.get(key)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                cache.set(key, perms, timeout=getattr(settings, 'PERMISSION_CACHE_TTL', 3600))
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
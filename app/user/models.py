@@ -1,7 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
 
+from auth.users import user_cache
 from portfolio.models import Category
+from user.perms import bump_perm_version, bump_role_type_version, invalidate_category_acl
+
+User = get_user_model()
 
 
 class RoleType(models.Model):
@@ -25,3 +32,61 @@ class Role(models.Model):
 
     def __str__(self) -> str:
         return f'{self.user.email} | {self.category} | {self.role_type.name}'
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    bump_perm_version(instance.pk)
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bump permission versions of users whose permissions or groups changed"""
+    if action in ('post_add', 'post_remove'):
+        user_ids = pk_set if reverse else {instance.pk}
+    elif action == 'pre_clear':
+        user_ids = set(instance.user_set.values_list('pk', flat=True)) if reverse else {instance.pk}
+    else:
+        return
+    bump_perm_version(*user_ids)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bump permission versions of every member of groups whose permissions changed"""
+    if action in ('post_add', 'post_remove'):
+        groups = Group.objects.filter(pk__in=pk_set) if reverse else [instance]
+    elif action == 'pre_clear':
+        groups = instance.group_set.all() if reverse else [instance]
+    else:
+        return
+    bump_perm_version(*User.objects.filter(groups__in=groups).values_list('pk', flat=True).distinct())
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    bump_perm_version(*instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(pre_save, sender=Role)
+def role_saving(sender, instance, **kwargs):
+    """Remember who held the role, a reassignment must invalidate them too"""
+    instance._previous_user_id = (
+        Role.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def role_changed(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_user_id', None)
+    invalidate_category_acl(*{instance.user_id, previous} - {None})
+
+
+@receiver(post_save, sender=RoleType)
+@receiver(post_delete, sender=RoleType)
+def role_type_changed(sender, instance, **kwargs):
+    bump_role_type_version()
@@ -0,0 +1,87 @@
+import time
+from collections import defaultdict
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+
+PERM_VERSION_KEY = 'perm_version:{}'
+PERM_SET_KEY = 'perm_set:{}:{}'
+CATEGORY_ACL_KEY = 'category_acl:{}:{}'
+ROLE_TYPE_VERSION_KEY = 'role_type_version'
+PERMISSION_MODELS = ('task', 'category', 'workitem', 'section', 'portfolio')
+
+
+def _new_version() -> int:
+    # seeded from the clock so a version evicted from the cache never repeats
+    return int(time.time() * 1000)
+
+
+def get_perm_version(user_id) -> int:
+    """Returns the current permission version for user_id"""
+    return cache.get_or_set(PERM_VERSION_KEY.format(user_id), _new_version, timeout=None)
+
+
+def bump_perm_version(*user_ids) -> None:
+    """Invalidates anything derived from the permissions of user_ids"""
+    for user_id in user_ids:
+        key = PERM_VERSION_KEY.format(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+
+
+def get_role_type_version() -> int:
+    """Returns a version that changes whenever any RoleType changes"""
+    return cache.get_or_set(ROLE_TYPE_VERSION_KEY, _new_version, timeout=None)
+
+
+def bump_role_type_version() -> None:
+    try:
+        cache.incr(ROLE_TYPE_VERSION_KEY)
+    except ValueError:
+        cache.set(ROLE_TYPE_VERSION_KEY, _new_version(), timeout=None)
+
+
+def invalidate_category_acl(*user_ids) -> None:
+    """Drops the materialized category ACL of user_ids"""
+    version = get_role_type_version()
+    cache.delete_many([CATEGORY_ACL_KEY.format(user_id, version) for user_id in user_ids])
+
+
+def get_perm_etag(user) -> str:
+    """Returns a strong ETag that changes whenever user's permissions change"""
+    return f'"perms-{user.pk}-{get_perm_version(user.pk)}"'
+
+
+_permission_names = {}
+
+
+def permission_names(*perms) -> dict:
+    """
+    Returns verbose permission names keyed by app_label.codename, loaded once
+    per process and reloaded when any of perms is missing from it
+    """
+    global _permission_names
+    if not _permission_names or any(perm not in _permission_names for perm in perms):
+        _permission_names = {
+            f'{app_label}.{codename}': name
+            for app_label, codename, name in Permission.objects.values_list(
+                'content_type__app_label', 'codename', 'name'
+            )
+        }
+    return _permission_names
+
+
+def get_permission_matrix(user) -> dict:
+    """
+    Returns user's permissions grouped by model name, across every app. Keys
+    are codenames, prefixed by the app label outside of the portfolio app.
+    """
+    perms = sorted(user.get_all_permissions())
+    names = permission_names(*perms)
+    matrix = defaultdict(dict, {model: {} for model in PERMISSION_MODELS})
+    for perm in perms:
+        model = perm.rpartition('_')[2]
+        matrix[model][perm.replace('portfolio.', '')] = {'verbose': names.get(perm), 'status': True}
+    return dict(matrix)
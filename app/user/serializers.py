@@ -8,6 +8,7 @@ from core.models import Profile
 from user.models import Role
 
 from utils.email import send_email
+from utils.queryplan import NestedRepresentationMixin
 
 
 class UserExistsException(APIException):
@@ -29,7 +30,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         exclude = ['created_at', 'updated_at', 'user']
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(NestedRepresentationMixin, serializers.ModelSerializer):
     """Serializer for users object"""
     profile = ProfileSerializer(read_only=True)
 
@@ -92,16 +93,18 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(NestedRepresentationMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Role
         fields = ['id', 'user', 'category', 'role_type', ]
         read_only_fields = ['id', ]
+        nested = {'user': UserSerializer}
 
     def to_representation(self, instance):
         representation = super(RoleSerializer, self).to_representation(instance)
-        representation['user'] = UserSerializer(instance=instance.user).data
-        representation['category'] = str(instance.category)
-        representation['role_type'] = str(instance.role_type)
+        if 'category' in representation:
+            representation['category'] = str(instance.category)
+        if 'role_type' in representation:
+            representation['role_type'] = str(instance.role_type)
         return representation
@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from portfolio.models import Category
+from user.acl import get_category_acl, get_role_level, scope_by_category
+from user.models import Role, RoleType
+
+
+User = get_user_model()
+
+
+class CategoryAclTests(TestCase):
+    """Test materialized category ACL"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(email='test@workbound.info', password='testpass123')
+        self.category = Category.objects.create(title='department 1', description='', created_by=self.user)
+        self.other = Category.objects.create(title='department 2', description='', created_by=self.user)
+
+    def test_highest_role_level_per_category(self):
+        """Test the ACL holds the user's highest role level per category"""
+        Role.objects.create(user=self.user, category=self.category, role_type=RoleType.objects.get(name='User'))
+        Role.objects.create(user=self.user, category=self.category, role_type=RoleType.objects.get(name='Manager'))
+
+        acl = get_category_acl(self.user)
+
+        self.assertEqual(acl, {self.category.id: RoleType.objects.get(name='Manager').level})
+
+    def test_acl_cached_and_invalidated_on_role_write(self):
+        """Test the ACL is served from cache until a role changes"""
+        get_category_acl(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_category_acl(self.user), {})
+
+        Role.objects.create(user=self.user, category=self.other, role_type=RoleType.objects.get(name='User'))
+
+        self.assertIn(self.other.id, get_category_acl(self.user))
+
+    def test_acl_invalidated_for_previous_user_on_reassign(self):
+        """Test reassigning a role drops the ACL of the user who held it"""
+        role = Role.objects.create(user=self.user, category=self.category, role_type=RoleType.objects.get(name='User'))
+        self.assertIn(self.category.id, get_category_acl(self.user))
+
+        role.user = User.objects.create_user(email='other@workbound.info', password='testpass123')
+        role.save()
+
+        self.assertEqual(get_category_acl(self.user), {})
+
+    def test_scope_by_category(self):
+        """Test querysets are scoped to categories with a role"""
+        Role.objects.create(user=self.user, category=self.category, role_type=RoleType.objects.get(name='User'))
+
+        categories = scope_by_category(Category.objects.all(), self.user, lookup='id')
+
+        self.assertEqual(list(categories), [self.category])
+
+    def test_missing_role_type_level_unreachable(self):
+        """Test a missing RoleType has a level no role reaches, cached like any other"""
+        RoleType.objects.filter(name='Manager').delete()
+
+        self.assertEqual(get_role_level('Manager'), float('inf'))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role_level('Manager'), float('inf'))
@@ -0,0 +1,120 @@
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+
+User = get_user_model()
+
+ALL_PERMS_URL = reverse('user:all_perms')
+
+
+def model_perms_url(model):
+    return reverse('user:model_perms', args=[model])
+
+
+class PermissionCacheTests(TestCase):
+    """Test permission sets shared across requests"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(email='test@workbound.info', password='testpass123')
+
+    def _fresh_user(self):
+        """Return a new instance of the user, as a later request would"""
+        return User.objects.get(pk=self.user.pk)
+
+    def test_permissions_shared_across_instances(self):
+        """Test a permission set is loaded once for all user instances"""
+        user = self._fresh_user()
+        self.assertTrue(user.has_perm('portfolio.view_workitem'))
+
+        user = self._fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('portfolio.view_workitem'))
+            self.assertFalse(user.has_perm('portfolio.add_workitem'))
+
+    def test_user_permission_change_invalidates(self):
+        """Test adding a user permission invalidates the cached set"""
+        self.assertFalse(self._fresh_user().has_perm('portfolio.add_workitem'))
+
+        self.user.user_permissions.add(Permission.objects.get(codename='add_workitem'))
+
+        self.assertTrue(self._fresh_user().has_perm('portfolio.add_workitem'))
+
+    def test_group_permission_change_invalidates(self):
+        """Test changing a group's permissions invalidates its members' sets"""
+        group = Group.objects.create(name='Managers')
+        self.user.groups.add(group)
+        self.assertFalse(self._fresh_user().has_perm('portfolio.add_workitem'))
+
+        group.permissions.add(Permission.objects.get(codename='add_workitem'))
+
+        self.assertTrue(self._fresh_user().has_perm('portfolio.add_workitem'))
+
+
+class PermissionMatrixApiTests(TestCase):
+    """Test the permission matrix endpoint"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(email='test@workbound.info', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_retrieve_permission_matrix(self):
+        """Test permissions are grouped by model with verbose names"""
+        res = self.client.get(ALL_PERMS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([list(x)[0] for x in res.data], ['task', 'category', 'workitem', 'section', 'portfolio'])
+        self.assertEqual(
+            res.data[2]['workitem'],
+            {'view_workitem': {'verbose': 'Can view Work Item', 'status': True}}
+        )
+
+    def test_permission_names_loaded_once(self):
+        """Test verbose names are read once per process, not per request"""
+        self.client.get(ALL_PERMS_URL)
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ALL_PERMS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_revalidate_unchanged_permissions(self):
+        """Test revalidating with a current ETag returns 304"""
+        etag = self.client.get(ALL_PERMS_URL)['ETag']
+
+        res = self.client.get(ALL_PERMS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_with_permissions(self):
+        """Test the ETag changes when user permissions change"""
+        etag = self.client.get(ALL_PERMS_URL)['ETag']
+        self.user.user_permissions.add(Permission.objects.get(codename='add_workitem'))
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+
+        res = self.client.get(ALL_PERMS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('add_workitem', res.data[2]['workitem'])
+
+    def test_retrieve_permissions_outside_portfolio(self):
+        """Test permissions of models in other apps are grouped by model"""
+        self.user.user_permissions.add(Permission.objects.get(codename='view_role'))
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+
+        res = self.client.get(model_perms_url('role'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['role_permissions'],
+            {'user.view_role': {'verbose': 'Can view role', 'status': True}}
+        )
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from auth.session import make_session_token
+from auth.users import user_cache
+
+
+User = get_user_model()
+
+SESSION_URL = reverse('user:session')
+ME_URL = reverse('user:me')
+WORKITEM_URL = reverse('portfolio:workitem-list')
+
+
+class SessionTokenApiTests(TestCase):
+    """Test session token exchange and authentication"""
+
+    def setUp(self) -> None:
+        user_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@workbound.info',
+            password='testpass123'
+        )
+
+    @patch('user.views.verify_id_token')
+    def test_exchange_firebase_token(self, verify):
+        """Test a valid firebase token is exchanged for a session token"""
+        verify.return_value = {'email': self.user.email, 'uid': 'abc123'}
+
+        res = self.client.post(SESSION_URL, {'token': 'firebase-token'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', res.data)
+        self.assertIn('expires', res.data)
+
+    @patch('user.views.verify_id_token')
+    def test_exchange_unknown_user_fails(self, verify):
+        """Test exchanging a token for an unknown user fails"""
+        verify.return_value = {'email': 'unknown@workbound.info', 'uid': 'abc123'}
+
+        res = self.client.post(SESSION_URL, {'token': 'firebase-token'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @patch('user.views.verify_id_token')
+    def test_exchange_resolves_user_by_uid(self, verify):
+        """Test the exchange resolves a linked user by firebase uid, not by email"""
+        self.user.firebase_uid = 'abc123'
+        self.user.save()
+        other = User.objects.create_user(email='other@workbound.info', password='testpass123')
+        verify.return_value = {'email': other.email, 'uid': 'abc123'}
+
+        res = self.client.post(SESSION_URL, {'token': 'firebase-token'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Session {res.data["token"]}')
+        self.assertEqual(self.client.get(ME_URL).data['email'], self.user.email)
+
+    @override_settings(FIREBASE_CHECK_REVOKED=True)
+    @patch('auth.revocation.get_revocation_checker')
+    @patch('user.views.verify_id_token')
+    def test_exchange_revoked_token_fails(self, verify, checker):
+        """Test a revoked firebase token is not exchanged for a session token"""
+        verify.return_value = {'email': self.user.email, 'uid': 'abc123', 'iat': 0}
+        checker.return_value.is_revoked.return_value = True
+
+        res = self.client.post(SESSION_URL, {'token': 'firebase-token'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        checker.return_value.is_revoked.assert_called_once_with('abc123', 0)
+
+    def test_session_token_authenticates(self):
+        """Test session token authenticates without a user lookup"""
+        token, _ = make_session_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Session {token}')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_tampered_session_token_rejected(self):
+        """Test a session token with an altered signature is rejected"""
+        token, _ = make_session_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Session {token[:-2]}xx')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_session_token_superseded_by_permission_change(self):
+        """Test a session token is rejected after user permissions change"""
+        token, _ = make_session_token(self.user)
+        self.user.user_permissions.remove(Permission.objects.get(name='Can view Work Item'))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Session {token}')
+
+        res = self.client.get(WORKITEM_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -11,6 +11,7 @@ urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('recaptcha/', views.verify_recaptcha, name='recaptcha'),
     path('sync/', views.sync_firebase_user, name='sync'),
+    path('session/', views.exchange_session_token, name='session'),
     path('me/', views.ManageUserView.as_view(), name='me'),
     path('me/update/', views.ProfileView.as_view(), name='profile'),
     path('perms/', views.retrieve_all_permissions, name='all_perms'),
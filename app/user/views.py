@@ -1,18 +1,24 @@
 import secrets
 import requests
-from django.contrib.auth.models import Permission
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.utils.http import parse_etags
 from rest_framework import generics, permissions, viewsets, mixins, status
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.exceptions import ValidationError
-from auth.authentication import FirebaseAuthentication
+from auth.authentication import FirebaseAuthentication, SessionTokenAuthentication
+from auth.keys import verify_id_token
+from auth.revocation import is_token_revoked
+from auth.session import make_session_token
+from auth.users import user_cache
 from user.filters import RoleFilter
 from user.models import Role
+from user.perms import PERMISSION_MODELS, get_perm_etag, get_permission_matrix
 
 from user.serializers import ProfileSerializer, UserSerializer, RoleSerializer
+from utils.queryplan import QueryPlanMixin, get_request_trees, plan_queryset
 
 from firebase_admin import auth
 
@@ -20,14 +26,11 @@ User = get_user_model()
 
 
 def get_perm_by_model_name(name, user):
-    perms = list(x.replace('portfolio.', '') for x in user.get_all_permissions() if x.endswith(f'_{name}'))
-    perms.sort()
-    perm_names = [{'verbose': x.name, 'status': True} for x in Permission.objects.filter(codename__in=perms)]
-    return (dict(zip(perms, perm_names)))
+    return get_permission_matrix(user).get(name, {})
 
 
 @api_view(['GET', ])
-@authentication_classes([FirebaseAuthentication])
+@authentication_classes([SessionTokenAuthentication, FirebaseAuthentication])
 @permission_classes([permissions.IsAuthenticated])
 def custom_user_model_permissions(request, model):
     perms = get_perm_by_model_name(name=model, user=request.user)
@@ -36,15 +39,16 @@ def custom_user_model_permissions(request, model):
 
 
 @api_view(['GET', ])
-@authentication_classes([FirebaseAuthentication])
+@authentication_classes([SessionTokenAuthentication, FirebaseAuthentication])
 @permission_classes([permissions.IsAuthenticated])
 def retrieve_all_permissions(request):
-    all_perms = []
-    models = ['task', 'category', 'workitem', 'section', 'portfolio']
-    for model in models:
-        perms = get_perm_by_model_name(name=model, user=request.user)
-        all_perms.append({model: perms})
-    return Response(status=status.HTTP_200_OK, data=all_perms)
+    etag = get_perm_etag(request.user)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    matrix = get_permission_matrix(request.user)
+    all_perms = [{model: matrix[model]} for model in PERMISSION_MODELS]
+    return Response(status=status.HTTP_200_OK, data=all_perms, headers={'ETag': etag})
 
 
 @api_view(['POST', ])
@@ -121,10 +125,33 @@ def sync_firebase_user(request):
     return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST', ])
+def exchange_session_token(request):
+    """Custom view to exchange a firebase ID token for a short-lived session token"""
+    token = request.data.get('token')
+    if not token:
+        return Response(status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        decoded_token = verify_id_token(token)
+        uid = decoded_token['uid']
+    except (KeyError, ValueError, auth.InvalidIdTokenError):
+        return Response(data={'error': 'Invalid Token'}, status=status.HTTP_401_UNAUTHORIZED)
+    if is_token_revoked(decoded_token):
+        return Response(data={'error': 'Revoked Token'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    user = user_cache.get_user(uid, email=decoded_token.get('email'))
+    if user is None or not user.is_active:
+        return Response(data={'error': 'User Not Found'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    session_token, expires = make_session_token(user)
+    return Response(data={'token': session_token, 'expires': expires}, status=status.HTTP_200_OK)
+
+
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = UserSerializer
-    authentication_classes = [FirebaseAuthentication]
+    authentication_classes = [SessionTokenAuthentication, FirebaseAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
@@ -139,7 +166,7 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
 class ProfileView(generics.UpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = ProfileSerializer
-    authentication_classes = [FirebaseAuthentication]
+    authentication_classes = [SessionTokenAuthentication, FirebaseAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
@@ -158,14 +185,15 @@ class ProfileView(generics.UpdateAPIView):
                             status=status.HTTP_400_BAD_REQUEST)
 
 
-class RoleViewSet(viewsets.GenericViewSet,
+class RoleViewSet(QueryPlanMixin,
+                  viewsets.GenericViewSet,
                   mixins.ListModelMixin,
                   mixins.CreateModelMixin,
                   ):
     """Manage Roles in the database"""
-    authentication_classes = (FirebaseAuthentication, )
+    authentication_classes = (SessionTokenAuthentication, FirebaseAuthentication, )
     permission_classes = (permissions.IsAuthenticated, RolePermission)
-    queryset = Role.objects.all()
+    queryset = Role.objects.select_related('category', 'role_type')
     serializer_class = RoleSerializer
     filterset_class = RoleFilter
 
@@ -174,8 +202,9 @@ class RoleUserListView(generics.ListAPIView):
     """List roles for current user"""
     serializer_class = RoleSerializer
     permission_classes = (permissions.IsAuthenticated, )
-    authentication_classes = (FirebaseAuthentication, )
+    authentication_classes = (SessionTokenAuthentication, FirebaseAuthentication, )
 
     def get_queryset(self):
         user = self.request.user
-        return Role.objects.filter(user=user)
+        queryset = Role.objects.filter(user=user).select_related('category', 'role_type')
+        return plan_queryset(queryset, self.get_serializer_class(), *get_request_trees(self.request))
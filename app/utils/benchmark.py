@@ -0,0 +1,22 @@
+import time
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def rolled_back():
+    """Runs the block in a transaction that is always rolled back, so seeded rows never persist"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def measure(func) -> tuple:
+    """Calls func and returns the milliseconds it took and the number of queries it ran"""
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, len(queries)
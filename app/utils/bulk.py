@@ -0,0 +1,163 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import F, Func, JSONField, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class _Resolved:
+    """Stands in for a PrimaryKeyRelatedField queryset with the objects already read"""
+
+    def __init__(self, queryset, pks):
+        self.model = queryset.model
+        self.objects = queryset.in_bulk(pks)
+
+    def get(self, pk):
+        try:
+            pk = self.model._meta.pk.to_python(pk)
+        except DjangoValidationError:
+            raise ValueError(pk)
+        try:
+            return self.objects[pk]
+        except KeyError:
+            raise self.model.DoesNotExist
+
+
+def _pks(field, items) -> set:
+    """Returns the primary keys items hold for field that could be valid"""
+    pks = set()
+    for item in items:
+        value = item.get(field.field_name) if isinstance(item, dict) else None
+        try:
+            pks.add(field.get_queryset().model._meta.pk.to_python(value))
+        except (DjangoValidationError, TypeError):
+            continue
+    pks.discard(None)
+    return pks
+
+
+@contextmanager
+def resolved_relations(serializer, items):
+    """Reads the objects items reference through serializer's primary key fields with one IN query per field"""
+    swapped = {}
+    for field in serializer.fields.values():
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and not field.read_only and field.pk_field is None:
+            swapped[field] = field.queryset
+            field.queryset = _Resolved(field.get_queryset(), _pks(field, items))
+    try:
+        yield
+    finally:
+        for field, queryset in swapped.items():
+            field.queryset = queryset
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer validating related primary keys with one query per
+    relation and saving with one bulk insert. Models may define
+    create_in_bulk(objs) to fill in what their save() computes.
+    """
+
+    def get_max_items(self) -> int:
+        return getattr(settings, 'BULK_CREATE_MAX_ITEMS', 1000)
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > self.get_max_items():
+            message = _('Ensure there are no more than {max} items.').format(max=self.get_max_items())
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+        with resolved_relations(self.child, data if isinstance(data, list) else []):
+            return super(BulkCreateListSerializer, self).to_internal_value(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        if hasattr(model, 'create_in_bulk'):
+            return model.create_in_bulk(objs)
+        return model._default_manager.bulk_create(objs)
+
+
+class BulkCreateMixin:
+    """
+    Accepts a list of objects on create, validated and inserted in bulk, and
+    answers with a summary instead of the serialized objects.
+    """
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super(BulkCreateMixin, self).create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(
+            {'created': len(serializer.instance), 'ids': [obj.pk for obj in serializer.instance]},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class JSONMerge(Func):
+    """Postgres jsonb concatenation of a column with value, keys of value win"""
+
+    arg_joiner = ' || '
+    template = '%(expressions)s'
+    output_field = JSONField()
+
+    def __init__(self, field_name, value):
+        super(JSONMerge, self).__init__(
+            Coalesce(F(field_name), Cast(Value('{}'), JSONField())),
+            Cast(Value(value, output_field=JSONField()), JSONField()),
+        )
+
+
+class BulkUpdateMixin:
+    """
+    Adds PATCH /<route>/bulk/ setting the fields of bulk_update_serializer_class
+    on every row the request's filters match, without loading the rows. JSON
+    objects are merged into the stored ones. Rows are updated by primary key
+    in batches of BULK_UPDATE_BATCH_SIZE, each in its own transaction, and the
+    number of rows updated is returned.
+    """
+
+    bulk_update_serializer_class = None
+
+    def get_bulk_update_queryset(self):
+        """Returns the rows the user may update among those the request filters to"""
+        return self.filter_queryset(self.get_queryset())
+
+    def get_bulk_update_values(self, validated_data) -> dict:
+        values = {}
+        for name, value in validated_data.items():
+            model_field = self.queryset.model._meta.get_field(name)
+            if isinstance(model_field, JSONField) and isinstance(value, dict):
+                value = JSONMerge(model_field.attname, value)
+            values[model_field.attname] = getattr(value, 'pk', value)
+        return values
+
+    @action(detail=False, methods=['patch'])
+    def bulk(self, request, *args, **kwargs):
+        """Update every row matching the filters and return the number updated"""
+        if not request.query_params:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [_('A filter is required.')]})
+        serializer = self.bulk_update_serializer_class(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        values = self.get_bulk_update_values(serializer.validated_data)
+
+        model = self.queryset.model
+        pks = self.get_bulk_update_queryset().order_by('pk').values_list('pk', flat=True)
+        batch_size = getattr(settings, 'BULK_UPDATE_BATCH_SIZE', 1000)
+        updated, last = 0, None
+        while True:
+            batch = list((pks if last is None else pks.filter(pk__gt=last))[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                updated += model._default_manager.filter(pk__in=batch).update(**values)
+            last = batch[-1]
+        return Response({'updated': updated})
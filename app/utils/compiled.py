@@ -0,0 +1,232 @@
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Count, FileField as ModelFileField
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from utils.fields import CountField, FormattedDateTime
+from utils.formats import compile_strftime
+from utils.queryplan import NestedRepresentationMixin, _expand_subtree, _fields_subtree
+
+
+def _identity(value):
+    return value
+
+
+def _datetime_converter(field):
+    """Formats like DateTimeField.to_representation with the timezone resolved once"""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() == ISO_8601:
+        return field.to_representation
+    field_timezone = getattr(field, 'timezone', field.default_timezone())
+    strftime = compile_strftime(output_format)
+
+    def convert(value):
+        if isinstance(value, str):
+            return value
+        if field_timezone is not None:
+            if timezone.is_aware(value):
+                value = value.astimezone(field_timezone)
+            else:
+                value = timezone.make_aware(value, field_timezone)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, timezone.utc)
+        return FormattedDateTime(strftime(value), value)
+    return convert
+
+
+def _file_converter(field, model_field):
+    """Renders a stored file name like FileField.to_representation"""
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return _identity
+    request = field.context.get('request', None)
+
+    def convert(name):
+        if not name:
+            return None
+        url = model_field.storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def _converter(field, model_field):
+    """Returns the function turning a .values() value into field's representation"""
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(model_field, ModelFileField):
+        return _file_converter(field, model_field)
+    if isinstance(field, serializers.BooleanField):
+        return bool
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, serializers.CharField):
+        return str
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return _identity
+    if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+        # .values() already holds the primary key of the related object
+        return _identity
+    return field.to_representation
+
+
+class CompiledSerializer:
+    """
+    Read only counterpart of a ModelSerializer that renders .values() rows.
+    Fields, nesting and the fields and expand trees are read once from a
+    serializer instance, each relation is then fetched with one query per
+    call instead of one serializer per row. The output matches the output of
+    the serializer it was compiled from.
+    """
+
+    def __init__(self, serializer):
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        self.model = serializer.Meta.model
+        # the ordering columns let paginators read their position from rows
+        self.columns = {'pk', *(x.lstrip('-') for x in self.model._meta.ordering if isinstance(x, str))}
+        self._accessors = []
+
+        nested = getattr(serializer.Meta, 'nested', {})
+        expand = getattr(serializer, '_expand_tree', None)
+        fields = getattr(serializer, '_fields_tree', None)
+        inline = getattr(serializer, '_inline', False)
+        for field in serializer._readable_fields:
+            name, source = field.field_name, field.source
+            if name in nested and (expand is None or name in expand):
+                child = nested[name](
+                    fields=_fields_subtree(fields, name), expand=_expand_subtree(expand, name), inline=inline
+                )
+                self._accessors.append(self._forward(name, source, CompiledSerializer(child), child.data))
+            elif isinstance(field, CountField):
+                self._accessors.append(self._reverse_count(name, field.relation))
+            elif isinstance(field, serializers.ListSerializer):
+                self._accessors.append(self._reverse(name, source, CompiledSerializer(field.child), many=True))
+            elif isinstance(field, serializers.BaseSerializer):
+                model_field = self.model._meta.get_field(source)
+                if model_field.concrete:
+                    self._accessors.append(self._forward(name, source, CompiledSerializer(field), None))
+                else:
+                    self._accessors.append(self._reverse(name, source, CompiledSerializer(field), many=False))
+            elif isinstance(field, serializers.ManyRelatedField):
+                self._accessors.append(self._reverse_pks(name, source))
+            else:
+                self._accessors.append(self._column(name, source, field))
+
+    def _model_field(self, source):
+        try:
+            return self.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(f'{self.model.__name__}.{source} can not be compiled')
+
+    def _column(self, name, source, field):
+        model_field = self._model_field(source)
+        if model_field.many_to_many:
+            raise ImproperlyConfigured(f'{self.model.__name__}.{source} can not be compiled')
+        self.columns.add(source)
+        convert = _converter(field, model_field)
+
+        def accessor(rows):
+            def get(row):
+                value = row[source]
+                return None if value is None else convert(value)
+            return name, get
+        return accessor
+
+    def _forward(self, name, source, child, empty):
+        """Relation to one object, fetched by primary key"""
+        self.columns.add(source)
+
+        def accessor(rows):
+            children = child.fetch(pk__in={row[source] for row in rows} - {None})
+
+            def get(row):
+                value = row[source]
+                return empty if value is None else children[value]
+            return name, get
+        return accessor
+
+    def _reverse(self, name, source, child, many):
+        """Relation to the objects of another model pointing at this one"""
+        remote = self._model_field(source).field
+        child.columns.add(remote.attname)
+
+        def accessor(rows):
+            groups = defaultdict(list)
+            pks = [row['pk'] for row in rows]
+            for child_row, data in child.fetch_rows(**{f'{remote.name}__in': pks}):
+                groups[child_row[remote.attname]].append(data)
+            if many:
+                return name, lambda row: groups.get(row['pk'], [])
+            return name, lambda row: groups[row['pk']][0] if row['pk'] in groups else None
+        return accessor
+
+    def _reverse_pks(self, name, source):
+        """Relation rendered as a list of the primary keys of related objects"""
+        remote = self._model_field(source).field
+
+        def accessor(rows):
+            groups = defaultdict(list)
+            pks = [row['pk'] for row in rows]
+            queryset = remote.model._default_manager.filter(**{f'{remote.name}__in': pks})
+            for key, pk in queryset.values_list(remote.attname, 'pk'):
+                groups[key].append(pk)
+            return name, lambda row: groups.get(row['pk'], [])
+        return accessor
+
+    def _reverse_count(self, name, relation):
+        """Number of objects of another model pointing at this one"""
+        remote = self._model_field(relation).field
+
+        def accessor(rows):
+            pks = [row['pk'] for row in rows]
+            queryset = remote.model._default_manager.filter(**{f'{remote.name}__in': pks}).order_by()
+            counts = dict(queryset.values_list(remote.attname).annotate(Count('pk')))
+            return name, lambda row: counts.get(row['pk'], 0)
+        return accessor
+
+    def values(self, queryset):
+        """Returns queryset as the .values() rows serialize() expects"""
+        return queryset.select_related(None).prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows) -> list:
+        """Returns the representation of every row"""
+        rows = list(rows)
+        if not rows:
+            return []
+        accessors = [accessor(rows) for accessor in self._accessors]
+        return [{name: get(row) for name, get in accessors} for row in rows]
+
+    def fetch_rows(self, **filters):
+        """Yields (row, representation) for the objects matching filters"""
+        rows = list(self.values(self.model._default_manager.filter(**filters)))
+        return zip(rows, self.serialize(rows))
+
+    def fetch(self, **filters) -> dict:
+        """Returns the representation of the objects matching filters by primary key"""
+        if not filters.get('pk__in', True):
+            return {}
+        return {row['pk']: data for row, data in self.fetch_rows(**filters)}
+
+
+class CompiledListMixin:
+    """
+    Serves list requests from .values() rows through a CompiledSerializer
+    compiled from the viewset's serializer for the current request.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        if not isinstance(serializer, NestedRepresentationMixin):
+            return super(CompiledListMixin, self).list(request, *args, **kwargs)
+
+        compiled = CompiledSerializer(serializer)
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize(page))
+        return Response(compiled.serialize(queryset))
@@ -0,0 +1,57 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+COUNT_KEY = 'count:{}:{}'
+
+
+def count_signature(queryset) -> str:
+    """Returns a digest of the filters of queryset, independent of its columns and ordering"""
+    sql, params = queryset.order_by().values_list('pk').query.sql_with_params()
+    return hashlib.sha256(repr((sql, params)).encode()).hexdigest()
+
+
+def estimate_count(queryset):
+    """
+    Returns the planner's row estimate for queryset, from pg_class.reltuples
+    when it is unfiltered and from EXPLAIN otherwise. None when the database
+    can not estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+            # reltuples is -1 (or 0 before PG 14) until the table is first analyzed
+            return int(row[0]) if row and row[0] > 0 else None
+        sql, params = queryset.order_by().values_list('pk').query.sql_with_params()
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_count(queryset, scope=None):
+    """
+    Returns (count, exact) for queryset. Estimates below COUNT_EXACT_THRESHOLD
+    are replaced by an exact count, results are cached per filter signature
+    and scope for COUNT_CACHE_TTL seconds.
+    """
+    key = COUNT_KEY.format(scope, count_signature(queryset))
+    result = cache.get(key)
+    if result is not None:
+        return tuple(result)
+
+    estimate = estimate_count(queryset)
+    if estimate is None or estimate < getattr(settings, 'COUNT_EXACT_THRESHOLD', 10000):
+        result = (queryset.count(), True)
+    else:
+        result = (estimate, False)
+    cache.set(key, result, getattr(settings, 'COUNT_CACHE_TTL', 30))
+    return result
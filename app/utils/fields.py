@@ -0,0 +1,42 @@
+from rest_framework import serializers
+
+
+class FormattedDateTime(str):
+    """A datetime formatted with DATETIME_FORMAT that keeps the datetime it was formatted from"""
+
+    def __new__(cls, text, value):
+        formatted = super(FormattedDateTime, cls).__new__(cls, text)
+        formatted.datetime = value
+        return formatted
+
+
+class DateTimeField(serializers.DateTimeField):
+    """
+    DateTimeField whose output renders as the formatted string in JSON and
+    lets binary renderers encode the datetime itself.
+    """
+
+    def to_representation(self, value):
+        text = super(DateTimeField, self).to_representation(value)
+        if not isinstance(text, str) or isinstance(value, str):
+            return text
+        return FormattedDateTime(text, self.enforce_timezone(value))
+
+
+class CountField(serializers.IntegerField):
+    """
+    Number of objects in the reverse relation ``relation``, read from the
+    annotation named like the field when the queryset was planned and
+    counted per instance otherwise.
+    """
+
+    def __init__(self, relation, **kwargs):
+        self.relation = relation
+        kwargs['read_only'] = True
+        super(CountField, self).__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        try:
+            return instance.__dict__[self.source]
+        except KeyError:
+            return getattr(instance, self.relation).count()
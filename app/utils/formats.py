@@ -0,0 +1,34 @@
+import operator
+from functools import lru_cache
+
+# strftime directives with a zero padding str.format can reproduce
+_DIRECTIVES = {
+    'Y': '{0.year}',
+    'm': '{0.month:02d}',
+    'd': '{0.day:02d}',
+    'H': '{0.hour:02d}',
+    'M': '{0.minute:02d}',
+    'S': '{0.second:02d}',
+    'f': '{0.microsecond:06d}',
+    '%': '%',
+}
+
+
+@lru_cache(maxsize=None)
+def compile_strftime(output_format: str):
+    """
+    Returns a function formatting a datetime like strftime(output_format).
+    Numeric formats are compiled to a str.format template, formats using
+    locale dependent directives fall back to strftime.
+    """
+    parts = []
+    chars = iter(output_format)
+    for char in chars:
+        if char != '%':
+            parts.append(char.replace('{', '{{').replace('}', '}}'))
+            continue
+        directive = _DIRECTIVES.get(next(chars, None))
+        if directive is None:
+            return operator.methodcaller('strftime', output_format)
+        parts.append(directive)
+    return ''.join(parts).format
@@ -0,0 +1,235 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from functools import partial, reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from django.utils.translation import ugettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from utils.counts import get_count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates on the queryset's ordering tuple, e.g. (order, id), with an
+    opaque cursor holding the values of the last row of the previous page.
+    Each page is one indexed range scan, no OFFSET and no COUNT, so deep
+    pages cost the same as the first one. Ascending fields sort NULLS LAST
+    and descending ones NULLS FIRST, the Postgres defaults, so the ordering
+    still matches plain composite indexes.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'size'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def get_max_page_size(self) -> int:
+        return getattr(settings, 'MAX_PAGE_SIZE', 1000)
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            size = self.page_size
+        return max(1, min(size, self.get_max_page_size()))
+
+    def get_ordering(self, queryset) -> list:
+        """Returns the ordering as (field, descending), ending with the primary key"""
+        ordering = [
+            (field.lstrip('-'), field.startswith('-'))
+            for field in (queryset.query.order_by or queryset.model._meta.ordering)
+        ]
+        if not ordering or ordering[-1][0] not in ('pk', queryset.model._meta.pk.attname):
+            ordering.append(('pk', ordering[-1][1] if ordering else False))
+        return ordering
+
+    def encode_cursor(self, position, reverse) -> str:
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        """Returns (position, reverse) or (None, False) for the first page"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            position, reverse = payload['p'], bool(payload['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def _after(field, descending, value):
+        """Q for rows strictly after value on field, None when there are none"""
+        if descending:
+            return Q(**{f'{field}__isnull': False}) if value is None else Q(**{f'{field}__lt': value})
+        if value is None:
+            return None
+        return Q(**{f'{field}__gt': value}) | Q(**{f'{field}__isnull': True})
+
+    def seek(self, ordering, position) -> Q:
+        """Q for rows after position in ordering"""
+        disjuncts = []
+        for index, (field, descending) in enumerate(ordering):
+            after = self._after(field, descending, position[index])
+            if after is None:
+                continue
+            for prefix_field, value in zip((x[0] for x in ordering[:index]), position):
+                after &= Q(**{f'{prefix_field}__isnull': True}) if value is None else Q(**{prefix_field: value})
+            disjuncts.append(after)
+        return reduce(or_, disjuncts) if disjuncts else Q(pk__in=[])
+
+    @staticmethod
+    def _order_by(ordering):
+        return [
+            F(field).desc(nulls_first=True) if descending else F(field).asc(nulls_last=True)
+            for field, descending in ordering
+        ]
+
+    @staticmethod
+    def _position(row, ordering) -> list:
+        if isinstance(row, dict):
+            return [row[field] for field, _descending in ordering]
+        return [getattr(row, field) for field, _descending in ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = [(field, descending != reverse) for field, descending in self.ordering]
+        if position is not None:
+            queryset = queryset.filter(self.seek(ordering, position))
+        rows = list(queryset.order_by(*self._order_by(ordering))[:self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.first = self._position(rows[0], self.ordering) if rows else None
+        self.last = self._position(rows[-1], self.ordering) if rows else None
+        return rows
+
+    def _link(self, position, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self._link(self.last, False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self._link(self.first, True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class CountedPage(Page):
+    """Page that knows whether more rows follow without an exact count"""
+
+    has_more = None
+
+    def has_next(self):
+        if self.has_more is None:
+            return super(CountedPage, self).has_next()
+        return self.has_more
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator counting through get_count(), so large results report an
+    estimate. The count, cached or estimated, is only reported: pages are
+    read with one extra row telling whether a next page exists, and pages
+    past the count are served as long as they hold rows.
+    """
+
+    def __init__(self, *args, scope=None, **kwargs):
+        super(CountedPaginator, self).__init__(*args, **kwargs)
+        self.scope = scope
+        self.count_exact = True
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super(CountedPaginator, self).count
+        count, self.count_exact = get_count(self.object_list, self.scope)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super(CountedPaginator, self).validate_number(number)
+        except EmptyPage:
+            if int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return CountedPage(*args, **kwargs)
+
+
+class CountedPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination with cached, possibly estimated counts flagged by count_exact"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        user = getattr(request, 'user', None)
+        self.django_paginator_class = partial(CountedPaginator, scope=getattr(user, 'pk', None))
+        return super(CountedPageNumberPagination, self).paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_exact', self.page.paginator.count_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super(CountedPageNumberPagination, self).get_paginated_response_schema(schema)
+        response_schema['properties']['count_exact'] = {'type': 'boolean'}
+        return response_schema
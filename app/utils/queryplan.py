@@ -0,0 +1,235 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from utils.fields import CountField, DateTimeField
+
+
+def parse_field_tree(value: str) -> dict:
+    """Parses 'id,section.id,section.category' into {'id': {}, 'section': {'id': {}, 'category': {}}}"""
+    tree = {}
+    for path in filter(None, (x.strip() for x in value.split(','))):
+        node = tree
+        for name in path.split('.'):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def get_request_trees(request):
+    """
+    Returns the (fields, expand) trees requested with ?fields= and ?expand=.
+    None means no restriction, an empty expand tree expands nothing.
+    Only read requests are restricted so writes keep every input field.
+    """
+    if getattr(request, 'method', None) not in SAFE_METHODS:
+        return None, None
+    params = request.query_params
+    fields = (parse_field_tree(params['fields']) or None) if 'fields' in params else None
+    expand = parse_field_tree(params['expand']) if 'expand' in params else None
+    return fields, expand
+
+
+def get_request_inline(request) -> bool:
+    """True when ?inline=true asks for child lists instead of child counts"""
+    if request is None:
+        return False
+    return request.query_params.get('inline', '').lower() in ('1', 'true', 'yes')
+
+
+def _fields_subtree(fields, name):
+    return None if fields is None else fields.get(name) or None
+
+
+def _expand_subtree(expand, name):
+    return None if expand is None else expand.get(name, {})
+
+
+def _selected(serializer_class, fields, inline):
+    """Returns the predicate telling whether a field is part of the output"""
+    if fields is not None:
+        return fields.__contains__
+    pairs = getattr(serializer_class.Meta, 'inline', {})
+    dropped = set(pairs.values()) if inline else set(pairs)
+    return lambda field_name: field_name not in dropped
+
+
+def count_annotation(model, relation):
+    """Returns an expression counting the objects of model's reverse relation"""
+    remote = model._meta.get_field(relation).field
+    counts = remote.model._default_manager.filter(**{remote.name: OuterRef('pk')}).order_by()
+    return Coalesce(Subquery(counts.values(remote.name).annotate(count=Count('pk')).values('count')), 0)
+
+
+def get_annotations(serializer_class, fields=None, inline=False) -> dict:
+    """Returns the annotations serializing instances of serializer_class's model needs"""
+    selected = _selected(serializer_class, fields, inline)
+    return {
+        field_name: count_annotation(serializer_class.Meta.model, field.relation)
+        for field_name, field in serializer_class._declared_fields.items()
+        if isinstance(field, CountField) and selected(field_name)
+    }
+
+
+class NestedRepresentationMixin:
+    """
+    Replaces related primary keys in the output of a ModelSerializer with the
+    representation of the serializers declared in ``Meta.nested``. Input still
+    accepts primary keys. Declaring the nesting lets get_query_plan() derive
+    the joins and prefetches needed to serialize a queryset.
+
+    ``fields`` and ``expand`` trees, read from the request when the serializer
+    is created by a view, prune the output and the relations rendered nested.
+    ``Meta.inline`` pairs a child list with the count rendered in its place
+    unless ``inline`` is set.
+    """
+
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.DateTimeField: DateTimeField,
+    }
+
+    def __init__(self, *args, fields=None, expand=None, inline=None, **kwargs):
+        super(NestedRepresentationMixin, self).__init__(*args, **kwargs)
+        request = kwargs.get('context', {}).get('request')
+        if request is not None and fields is None and expand is None and inline is None:
+            fields, expand = get_request_trees(request)
+            inline = get_request_inline(request)
+        self.restrict(fields, expand, bool(inline))
+
+    def restrict(self, fields=None, expand=None, inline=False):
+        """Limits output to the fields tree and nesting to the expand tree"""
+        self._fields_tree = fields
+        self._expand_tree = expand
+        self._inline = inline
+        selected = _selected(type(self), fields, inline)
+        for field_name in list(self.fields):
+            if not selected(field_name):
+                self.fields.pop(field_name)
+        for field_name, field in self.fields.items():
+            child = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(child, NestedRepresentationMixin):
+                child.restrict(_fields_subtree(fields, field_name), _expand_subtree(expand, field_name), inline)
+
+    def to_representation(self, instance):
+        data = super(NestedRepresentationMixin, self).to_representation(instance)
+        fields, expand = self._fields_tree, self._expand_tree
+        for field_name, serializer_class in getattr(self.Meta, 'nested', {}).items():
+            if field_name not in data or (expand is not None and field_name not in expand):
+                continue
+            data[field_name] = serializer_class(
+                instance=getattr(instance, field_name),
+                fields=_fields_subtree(fields, field_name),
+                expand=_expand_subtree(expand, field_name),
+                inline=self._inline,
+            ).data
+        return data
+
+
+def _nested_serializers(serializer_class):
+    """Yields (field name, serializer class, many) for every nested serializer"""
+    for field_name, serializer_class_ in getattr(serializer_class.Meta, 'nested', {}).items():
+        yield field_name, serializer_class_, False
+    for field_name, field in serializer_class._declared_fields.items():
+        if isinstance(field, serializers.ListSerializer):
+            yield field.source or field_name, type(field.child), True
+        elif isinstance(field, serializers.BaseSerializer):
+            yield field.source or field_name, type(field), False
+
+
+def _is_multiple(model_field) -> bool:
+    return model_field.one_to_many or model_field.many_to_many
+
+
+def _prefixed(prefix, lookups):
+    for lookup in lookups:
+        if isinstance(lookup, Prefetch):
+            yield Prefetch(prefix + lookup.prefetch_through, queryset=lookup.queryset)
+        else:
+            yield prefix + lookup
+
+
+def get_query_plan(serializer_class, fields=None, expand=None, inline=False):
+    """
+    Returns the (select_related, prefetch_related) lookups needed to serialize
+    instances of serializer_class's model without further queries.
+    Single valued relations are joined, multi valued ones are prefetched with
+    a queryset planned from their own serializer. Relations pruned by the
+    fields or expand trees, or replaced by counts, are neither joined nor fetched.
+    """
+    model = serializer_class.Meta.model
+    nested = getattr(serializer_class.Meta, 'nested', {})
+    selected = _selected(serializer_class, fields, inline)
+    select_related, prefetch_related = [], []
+    planned = set()
+
+    for field_name, child, many in _nested_serializers(serializer_class):
+        planned.add(field_name)
+        if not selected(field_name):
+            continue
+        if field_name in nested and expand is not None and field_name not in expand:
+            continue
+        model_field = model._meta.get_field(field_name)
+        child_fields = _fields_subtree(fields, field_name)
+        child_select, child_prefetch = get_query_plan(
+            child, child_fields, _expand_subtree(expand, field_name), inline
+        )
+        if many or _is_multiple(model_field):
+            queryset = child.Meta.model._default_manager.select_related(*child_select)
+            queryset = queryset.annotate(**get_annotations(child, child_fields, inline))
+            prefetch_related.append(Prefetch(field_name, queryset=queryset.prefetch_related(*child_prefetch)))
+        else:
+            select_related.append(field_name)
+            select_related.extend(_prefixed(f'{field_name}__', child_select))
+            prefetch_related.extend(_prefixed(f'{field_name}__', child_prefetch))
+
+    # remaining multi valued relations are rendered as primary key lists
+    field_names = getattr(serializer_class.Meta, 'fields', serializers.ALL_FIELDS)
+    if field_names == serializers.ALL_FIELDS:
+        exclude = getattr(serializer_class.Meta, 'exclude', ())
+        field_names = [f.name for f in model._meta.get_fields() if not f.auto_created and f.name not in exclude]
+    for field_name in field_names:
+        if field_name in planned or field_name in serializer_class._declared_fields:
+            continue
+        if not selected(field_name):
+            continue
+        try:
+            model_field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            continue
+        if model_field.is_relation and _is_multiple(model_field):
+            related_model = model_field.related_model
+            if model_field.one_to_many:
+                only = ('pk', model_field.field.attname)
+                queryset = related_model._default_manager.only(*only)
+            else:
+                queryset = related_model._default_manager.only('pk')
+            prefetch_related.append(Prefetch(field_name, queryset=queryset))
+
+    return select_related, prefetch_related
+
+
+def plan_queryset(queryset, serializer_class, fields=None, expand=None, inline=False):
+    """Applies the query plan of serializer_class to queryset"""
+    select_related, prefetch_related = get_query_plan(serializer_class, fields, expand, inline)
+    queryset = queryset.annotate(**get_annotations(serializer_class, fields, inline))
+    return queryset.select_related(*select_related).prefetch_related(*prefetch_related)
+
+
+class QueryPlanMixin:
+    """
+    Plans the joins and prefetches of a viewset's queryset from its serializer
+    and the ?fields=, ?expand= and ?inline= parameters of the request.
+    """
+
+    def get_query_trees(self):
+        """Returns the (fields, expand) trees the queryset is planned for"""
+        return get_request_trees(getattr(self, 'request', None))
+
+    def get_queryset(self):
+        queryset = super(QueryPlanMixin, self).get_queryset()
+        fields, expand = self.get_query_trees()
+        inline = get_request_inline(getattr(self, 'request', None))
+        return plan_queryset(queryset, self.get_serializer_class(), fields, expand, inline)
@@ -0,0 +1,168 @@
+import csv
+import datetime
+import itertools
+import json
+
+import msgpack
+
+from django.utils import timezone
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework import ISO_8601
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from utils.fields import FormattedDateTime
+from utils.formats import compile_strftime
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def format_datetime(value: datetime.datetime) -> str:
+    """Formats value in the current timezone like a serializer DateTimeField"""
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None or output_format.lower() == ISO_8601:
+        return JSONEncoder().default(value)
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return compile_strftime(output_format)(value)
+
+
+class FastJSONEncoder(JSONEncoder):
+    """JSONEncoder formatting datetimes with DATETIME_FORMAT and knowing PhoneNumber"""
+
+    def default(self, obj):
+        if isinstance(obj, datetime.datetime):
+            return format_datetime(obj)
+        if isinstance(obj, PhoneNumber):
+            return str(obj)
+        return super(FastJSONEncoder, self).default(obj)
+
+
+def _orjson_default(obj):
+    # orjson hands over every type it does not serialize natively
+    return FastJSONEncoder().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same compact output with orjson when it is
+    installed. Indented output, requested by the browsable API or an
+    ``indent`` media type parameter, and installs without orjson use the
+    stdlib encoder.
+    """
+
+    encoder_class = FastJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super(FastJSONRenderer, self).render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super(FastJSONRenderer, self).render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_orjson_default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        # same escaping as JSONRenderer, these are valid JSON but not valid javascript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def _timestamp(value: datetime.datetime) -> msgpack.Timestamp:
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return msgpack.Timestamp.from_datetime(value)
+
+
+def _msgpack_default(obj):
+    # packb runs with strict_types so subclasses of builtin types, like
+    # ReturnDict or the formatted datetimes of serializers, end up here
+    if isinstance(obj, FormattedDateTime):
+        return _timestamp(obj.datetime)
+    if isinstance(obj, datetime.datetime):
+        return _timestamp(obj)
+    for native in (str, int, float, dict):
+        if isinstance(obj, native):
+            return native(obj)
+    if isinstance(obj, (list, tuple)):
+        return list(obj)
+    obj = FastJSONEncoder().default(obj)
+    return list(obj) if isinstance(obj, tuple) else obj
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders MessagePack, with datetimes as timestamp extension types"""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, strict_types=True, use_bin_type=True)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renders one compact JSON document per line"""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+    render_style = 'binary'
+
+    def stream(self, rows, header=None):
+        """Yields the encoded line of every row"""
+        renderer = FastJSONRenderer()
+        for row in rows:
+            yield renderer.render(row) + b'\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.stream(data if isinstance(data, list) else [data]))
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=FastJSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return value
+
+
+class CSVRenderer(BaseRenderer):
+    """Renders rows as CSV, nested values as JSON cells"""
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def stream(self, rows, header=None):
+        """Yields the encoded header and lines, header defaults to the keys of the first row"""
+        writer = csv.writer(_Echo())
+        rows = iter(rows)
+        if header is None:
+            first = next(rows, None)
+            if first is None:
+                return
+            header = list(first)
+            rows = itertools.chain([first], rows)
+        yield writer.writerow(header).encode(self.charset)
+        for row in rows:
+            yield writer.writerow([_csv_cell(row.get(name)) for name in header]).encode(self.charset)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.stream(data if isinstance(data, list) else [data]))
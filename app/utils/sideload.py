@@ -0,0 +1,105 @@
+from collections import defaultdict
+
+from django.http.multipartparser import parse_header
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from utils.queryplan import plan_queryset
+
+ENVELOPE_INCLUDED = 'included'
+
+
+def wants_included(request) -> bool:
+    """
+    True when the client asked for the side-loaded envelope with
+    ?envelope=included or ``Accept: application/json; envelope=included``.
+    """
+    if request is None:
+        return False
+    if request.query_params.get('envelope') == ENVELOPE_INCLUDED:
+        return True
+    accepted = getattr(request, 'accepted_media_type', None)
+    if not accepted:
+        return False
+    _media_type, params = parse_header(accepted.encode('latin-1'))
+    return params.get('envelope', b'').decode('latin-1') == ENVELOPE_INCLUDED
+
+
+def included_key(serializer_class) -> str:
+    """Returns the key objects of serializer_class are side-loaded under"""
+    return str(serializer_class.Meta.model._meta.verbose_name_plural).lower().replace(' ', '_')
+
+
+def _collect(serializer_class, rows, pending):
+    """Adds the ids referenced by rows' nested relations to pending"""
+    for field_name, child in getattr(serializer_class.Meta, 'nested', {}).items():
+        for row in rows:
+            value = row.get(field_name)
+            if value is not None:
+                pending[child].add(value)
+    for field_name, field in serializer_class._declared_fields.items():
+        if isinstance(field, serializers.ListSerializer):
+            child_rows = [item for row in rows for item in row.get(field_name) or ()]
+            _collect(type(field.child), child_rows, pending)
+        elif isinstance(field, serializers.BaseSerializer):
+            child_rows = [row[field_name] for row in rows if row.get(field_name)]
+            _collect(type(field), child_rows, pending)
+
+
+def collect_included(serializer_class, rows) -> dict:
+    """
+    Returns every object referenced by rows, transitively, grouped by type.
+    Each distinct object is serialized once with its relations as ids and
+    each type is fetched with one IN query per level of the tree.
+    """
+    included = {}
+    fetched = defaultdict(set)
+    pending = defaultdict(set)
+    _collect(serializer_class, rows, pending)
+    while pending:
+        child, ids = pending.popitem()
+        ids -= fetched[child]
+        if not ids:
+            continue
+        fetched[child] |= ids
+        queryset = plan_queryset(child.Meta.model._default_manager.filter(pk__in=ids), child, expand={})
+        data = child(queryset, many=True, expand={}).data
+        included.setdefault(included_key(child), []).extend(data)
+        _collect(child, data, pending)
+    return included
+
+
+class IncludedEnvelopeMixin:
+    """
+    Alternative list envelope in which rows reference related objects by id
+    and every distinct related object is emitted once under ``included``.
+    """
+
+    def get_query_trees(self):
+        fields, expand = super(IncludedEnvelopeMixin, self).get_query_trees()
+        if wants_included(getattr(self, 'request', None)):
+            expand = {}
+        return fields, expand
+
+    def list(self, request, *args, **kwargs):
+        if not wants_included(request):
+            return super(IncludedEnvelopeMixin, self).list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        fields, expand = self.get_query_trees()
+        serializer_class = self.get_serializer_class()
+        data = serializer_class(
+            page if page is not None else queryset,
+            many=True,
+            context=self.get_serializer_context(),
+            fields=fields,
+            expand=expand,
+        ).data
+
+        if page is not None:
+            response = self.get_paginated_response(data)
+        else:
+            response = Response({'results': data})
+        response.data['included'] = collect_included(serializer_class, data)
+        return response
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from portfolio.models import Portfolio
+from portfolio.tests.test_portfolio_api import sample_portfolio
+from utils.counts import get_count
+from utils.helpers import sample_email, sample_id
+
+
+User = get_user_model()
+
+PORTFOLIO_URL = reverse('portfolio:portfolio-list')
+
+
+class CountTests(TestCase):
+    """Test cached and estimated counts"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(email=sample_email(), password=sample_id())
+        for _ in range(3):
+            sample_portfolio(user=self.user)
+
+    def test_exact_count_below_threshold_is_cached(self):
+        """Test small results are counted exactly once per TTL"""
+        queryset = Portfolio.objects.filter(created_by=self.user)
+
+        self.assertEqual(get_count(queryset, self.user.pk), (3, True))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_count(queryset, self.user.pk), (3, True))
+
+    @override_settings(COUNT_EXACT_THRESHOLD=0)
+    def test_estimated_count_above_threshold(self):
+        """Test large results report the planner estimate"""
+        count, exact = get_count(Portfolio.objects.filter(created_by=self.user))
+
+        self.assertFalse(exact)
+        self.assertGreater(count, 0)
+
+    @override_settings(COUNT_EXACT_THRESHOLD=0)
+    def test_pages_past_estimate_are_served(self):
+        """Test an estimated count does not truncate pages"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        res = client.get(PORTFOLIO_URL)
+
+        self.assertFalse(res.data['count_exact'])
+        self.assertEqual(len(res.data['results']), 3)
+        self.assertIsNone(res.data['next'])
+
+    def test_cached_count_does_not_truncate_pages(self):
+        """Test rows created while a count is cached are still listed"""
+        self.user.user_permissions.add(Permission.objects.get(name='Can view Portfolio'))
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.get(PORTFOLIO_URL)
+        sample_portfolio(user=self.user)
+
+        res = client.get(PORTFOLIO_URL)
+
+        self.assertEqual(res.data['count'], 3)
+        self.assertEqual(len(res.data['results']), 4)
@@ -0,0 +1,103 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import msgpack
+
+from django.test import TestCase, override_settings
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from utils.fields import FormattedDateTime
+from utils.formats import compile_strftime
+from utils.parsers import FastJSONParser, MessagePackParser
+from utils.renderers import FastJSONRenderer, MessagePackRenderer
+
+
+class FormatTests(TestCase):
+    """Test compiled datetime formats"""
+
+    def test_compiled_format_matches_strftime(self):
+        """Test compiled formats match strftime"""
+        value = datetime.datetime(2021, 3, 4, 5, 6, 7, 89)
+        for output_format in ('%m-%d-%Y %H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f', '100%% {%d}', '%a %d %b'):
+            with self.subTest(output_format=output_format):
+                self.assertEqual(compile_strftime(output_format)(value), value.strftime(output_format))
+
+
+class FastJSONRendererTests(TestCase):
+    """Test the JSON renderer"""
+
+    def test_render_matches_json_renderer(self):
+        """Test output is byte identical to JSONRenderer for serializer output"""
+        data = {
+            'results': [{'id': 1, 'title': 'Ünïcode  ', 'meta': {'a': [1, 2.5, None, True]}}],
+            'count': 1,
+            2: 'non str key',
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @override_settings(TIME_ZONE='UTC')
+    def test_render_native_types(self):
+        """Test datetimes use DATETIME_FORMAT and other types render as strings"""
+        value = uuid.uuid4()
+        data = {
+            'created': datetime.datetime(2021, 3, 4, 5, 6, 7, tzinfo=datetime.timezone.utc),
+            'uuid': value,
+            'amount': decimal.Decimal('1.5'),
+            'phone': PhoneNumber.from_string('+12125552368'),
+        }
+
+        self.assertEqual(
+            FastJSONRenderer().render(data),
+            f'{{"created":"03-04-2021 05:06:07","uuid":"{value}","amount":1.5,"phone":"+12125552368"}}'.encode()
+        )
+
+    def test_render_indented(self):
+        """Test indented output is supported"""
+        res = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+
+        self.assertEqual(res, b'{\n  "a": 1\n}')
+
+
+class FastJSONParserTests(TestCase):
+    """Test the JSON parser"""
+
+    def test_parse(self):
+        """Test UTF-8 bodies are parsed"""
+        data = FastJSONParser().parse(io.BytesIO('{"title": "Ünïcode", "ids": [1, 2]}'.encode()))
+
+        self.assertEqual(data, {'title': 'Ünïcode', 'ids': [1, 2]})
+
+
+class MessagePackTests(TestCase):
+    """Test the MessagePack renderer and parser"""
+
+    def test_round_trip(self):
+        """Test rendered data parses back with datetimes as timestamps"""
+        created = datetime.datetime(2021, 3, 4, 5, 6, 7, 89, tzinfo=datetime.timezone.utc)
+        data = ReturnDict({
+            'id': 1,
+            'created': FormattedDateTime('03-04-2021 05:06:07', created),
+            'results': ({'title': 'Ünïcode', 'meta': None},),
+            'amount': decimal.Decimal('1.5'),
+        }, serializer=None)
+
+        rendered = MessagePackRenderer().render(data)
+
+        self.assertEqual(
+            msgpack.unpackb(rendered, timestamp=0)['created'], msgpack.Timestamp.from_datetime(created)
+        )
+        self.assertEqual(
+            MessagePackParser().parse(io.BytesIO(rendered)),
+            {'id': 1, 'created': created, 'results': [{'title': 'Ünïcode', 'meta': None}], 'amount': 1.5}
+        )
+
+    def test_parse_invalid(self):
+        """Test malformed bodies raise ParseError"""
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\xc1'))